@@ -1,20 +1,35 @@
 import typer
 import asyncio
+import functools
 import os
-from typing import Optional
-import pandas as pd
+import sqlite3
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+import polars as pl
 from rich.console import Console
+from rich.style import Style
 from rich.table import Table
+from rich.text import Text
 from rich import print
 from src.ingestion import GitHubClient
 from src.processing import compute_risk_metrics
 from src.explorer import run_explorer
-from src.registry_clients import NPMClient, PyPIClient, MavenClient
+from src.registry_clients import NPMClient, PyPIClient, MavenClient, PackageRegistryClient
+
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
 
 app = typer.Typer()
 console = Console()
 
 
+def _run(coro):
+    """Run a scan coroutine, on uvloop when it is installed."""
+    return asyncio.run(coro, loop_factory=uvloop.new_event_loop if uvloop is not None else None)
+
+
 @app.command()
 def explore(
     db: str = typer.Option("risk_report.db", help="Path to the SQLite database")
@@ -49,7 +64,7 @@ def scan(
     """
     Scans repositories for maintainer risk.
     """
-    asyncio.run(_scan_async(token, limit, query))
+    _run(_scan_async(token, limit, query))
 
 
 async def _scan_async(token: str, limit: int, query: str):
@@ -68,234 +83,398 @@ async def _scan_async(token: str, limit: int, query: str):
         
         console.print(f"[bold blue]Starting Risk Scan for {len(repo_list)} repositories...[/bold blue]")
 
-        # 2. Ingestion
-        results = await client.fetch_batch(repo_list)
+        # 2. Ingestion, processing and export to SQLite (upsert by repo name), chunk by chunk
+        df = await _stream_risk_metrics(client, repo_list, "risk_report.db")
     finally:
         await client.close()
     
-    # 3. Processing
-    df = compute_risk_metrics(results)
-    
     if df.is_empty():
         console.print("[red]No valid data to process.[/red]")
         return
     
-    # 4. Visualization (The Dashboard)
-    table = Table(title="Open Source Maintainer Risk Report")
-    
-    table.add_column("Repository", style="cyan", no_wrap=True)
-    table.add_column("Lang", justify="left")
-    table.add_column("Risk", justify="right")
-    table.add_column("Level", justify="center")
-    table.add_column("Velocity", justify="right")
-    table.add_column("Gini", justify="right")
-    table.add_column("Top 1", justify="right")
-    table.add_column("Top 3", justify="right")
-    table.add_column("Contribs", justify="right")
-    table.add_column("Commits (1Y)", justify="right")
-    table.add_column("Recent (3M)", justify="right")
-    
-    # Take top 20 riskiest
-    top_risk = df.head(20)
-    
-    for row in top_risk.iter_rows(named=True):
-        # Color coding the output based on risk level
-        level_color = "green"
-        if row["risk_level"] == "CRITICAL":
-            level_color = "red bold"
-        elif row["risk_level"] == "HIGH":
-            level_color = "orange1"
-        elif row["risk_level"] == "MEDIUM":
-            level_color = "yellow"
-        
-        # Check if we have valid contributor data (use the explicit flag or check for None values)
-        has_contributor_data = row.get("contributor_data_available", False) or (
-            row["contributor_count"] is not None and 
-            row["gini_coefficient"] is not None
-        )
-        
-        # Color code Gini (higher = more concentrated = riskier)
-        if has_contributor_data and row["gini_coefficient"] is not None:
-            gini = row["gini_coefficient"]
-            gini_color = "green" if gini < 0.5 else "yellow" if gini < 0.75 else "red"
-            gini_str = f"[{gini_color}]{gini:.2f}[/{gini_color}]"
-            top1_str = f"{row['top1_share']:.0%}" if row['top1_share'] is not None else "[dim]N/A[/dim]"
-            top3_str = f"{row['top3_share']:.0%}" if row['top3_share'] is not None else "[dim]N/A[/dim]"
-            contrib_str = str(row["contributor_count"]) if row["contributor_count"] is not None else "[dim]?[/dim]"
-        else:
-            gini_str = "[dim]N/A[/dim]"
-            top1_str = "[dim]N/A[/dim]"
-            top3_str = "[dim]N/A[/dim]"
-            contrib_str = "[dim]?[/dim]"
-        
-        # Create clickable link to GitHub repo
-        repo_name = row["repo"]
-        repo_url = f"https://github.com/{repo_name}"
-        repo_link = f"[link={repo_url}]{repo_name}[/link]"
+    # 3. Visualization (The Dashboard)
+    _display_scan_results(df)
+    _print_saved("risk_report.db")
+
+
+async def _stream_risk_metrics(
+    client: GitHubClient,
+    repo_list: List[Dict[str, Any]],
+    output_path: str,
+    pkg_df: Optional[pl.DataFrame] = None,
+) -> pl.DataFrame:
+    """
+    Fetch GitHub stats as they complete, computing risk metrics and upserting
+    them to SQLite one chunk at a time. Rows are enriched with package info
+    when pkg_df is given. Returns the metrics for all chunks.
+    """
+    frames = []
+    conn = None
+    try:
+        async for batch in client.fetch_batch_streamed(repo_list):
+            # Polars releases the GIL, so scoring a chunk in a worker thread
+            # overlaps with the GitHub requests still in flight
+            df_chunk = await asyncio.to_thread(compute_risk_metrics, batch)
+            if df_chunk.is_empty():
+                continue
+            if pkg_df is not None:
+                df_chunk = df_chunk.join(pkg_df, on="repo", how="left")
+            frames.append(df_chunk)
             
-        table.add_row(
-            repo_link,
-            row.get("language", "?"),
-            f"{row['total_risk_score']:.1f}",
-            f"[{level_color}]{row['risk_level']}[/{level_color}]",
-            f"{row['velocity_ratio']:.2f}x",
-            gini_str,
-            top1_str,
-            top3_str,
-            contrib_str,
-            str(row.get("total_commits", "?")),
-            str(row.get("recent_commits", "?")),
-        )
-        
-    console.print(table)
-    
-    # Legend
-    console.print("\n[bold]Legend:[/bold]")
-    console.print("[dim]• Commits (1Y): Total commits in the last 52 weeks (1 year)[/dim]")
-    console.print("[dim]• Recent (3M): Commits in the last 13 weeks (~3 months)[/dim]")
-    console.print("[dim]• Velocity: Recent (13 wks) vs older (13 wks) commits. >1x = growing, <1x = declining[/dim]")
-    console.print("[dim]• Gini: Contribution inequality (0 = equal, 1 = one person). >0.75 = high concentration[/dim]")
-    console.print("[dim]• Top 1/3: % of commits by top contributors. >50% (top1) or >80% (top3) = bus factor risk[/dim]")
-    console.print("[dim]• Contribs: Total unique contributors. More = lower bus factor risk[/dim]")
-    console.print("[dim]• N/A: GitHub stats still computing or unavailable (retry later)[/dim]")
-    
-    # 5. Export to SQLite (append mode, skip duplicates by repo name)
-    import sqlite3
-    output_path = "risk_report.db"
-    
-    # Use WAL mode for better concurrent access (multiple scans can run in parallel)
-    conn = sqlite3.connect(output_path, timeout=30.0)
-    conn.execute("PRAGMA journal_mode=WAL")
-    conn.execute("PRAGMA busy_timeout=30000")  # Wait up to 30s for locks
+            # Only rows with a score and contributor stats are worth persisting;
+            # the rest (e.g. stats still pending) are shown but not exported
+            df_export = df_chunk.filter(
+                pl.col("total_risk_score").is_not_null() & pl.col("contributor_data_available")
+            )
+            if df_export.is_empty():
+                continue
+            if conn is None:
+                conn = _connect_sqlite(output_path)
+            # Upserts (and any lock waits) run off the event loop, one chunk at a time
+            await asyncio.to_thread(_upsert_rows, conn, df_export)
+    finally:
+        if conn is not None:
+            _close_sqlite(conn)
     
-    # Use INSERT OR REPLACE to update existing repos (repo as unique key)
-    pdf = df.to_pandas()
-    pdf["updated_at"] = pd.Timestamp.now()
+    if not frames:
+        return pl.DataFrame()
+    # Chunks can infer different dtypes for all-null columns, so relax on concat
+    return pl.concat(frames, how="diagonal_relaxed", rechunk=False)
+
+
+# Styles are parsed once; cells are built as Text so Rich never parses markup per cell
+_STYLES = {
+    name: Style.parse(name) if name else Style.null()
+    for name in ("", "dim", "green", "yellow", "orange1", "red", "red bold")
+}
+
+_LEVEL_COLORS = {"CRITICAL": "red bold", "HIGH": "orange1", "MEDIUM": "yellow", "LOW": "green"}
+
+_SCAN_COLUMNS = (
+    ("Repository", {"style": "cyan", "no_wrap": True}),
+    ("Lang", {"justify": "left"}),
+    ("Risk", {"justify": "right"}),
+    ("Level", {"justify": "center"}),
+    ("Velocity", {"justify": "right"}),
+    ("Gini", {"justify": "right"}),
+    ("Top 1", {"justify": "right"}),
+    ("Top 3", {"justify": "right"}),
+    ("Contribs", {"justify": "right"}),
+    ("Commits (1Y)", {"justify": "right"}),
+    ("Recent (3M)", {"justify": "right"}),
+)
+
+# Registry tables share every column except the popularity count header
+_REGISTRY_COLUMNS = (
+    ("Package", {"style": "cyan", "no_wrap": True}),
+    ("Repository", {"style": "dim"}),
+    (None, {"justify": "right"}),
+    ("Risk", {"justify": "right"}),
+    ("Level", {"justify": "center"}),
+    ("Velocity", {"justify": "right"}),
+    ("Gini", {"justify": "right"}),
+    ("Top 1", {"justify": "right"}),
+    ("Contribs", {"justify": "right"}),
+)
+
+
+def _new_table(title: str, columns, count_header: Optional[str] = None) -> Table:
+    """Create a Table from a column schema, filling in the count header if needed."""
+    table = Table(title=title)
+    for header, options in columns:
+        table.add_column(header or count_header, **options)
+    return table
+
+
+def _fixed(expr: pl.Expr, decimals: int) -> pl.Expr:
+    """Format a non-negative float expression with a fixed number of decimals."""
+    scale = 10 ** decimals
+    scaled = (expr * scale).round(0).cast(pl.Int64)
+    if decimals == 0:
+        return scaled.cast(pl.Utf8)
+    return pl.format(
+        "{}.{}",
+        scaled // scale,
+        (scaled % scale).cast(pl.Utf8).str.zfill(decimals),
+    )
+
+
+def _format_count(expr: pl.Expr, billions: bool = False) -> pl.Expr:
+    """Format a count as 1.2B / 3.4M / 56K / 789."""
+    suffixes = [(1_000_000, "M", 1), (1_000, "K", 0)]
+    if billions:
+        suffixes.insert(0, (1_000_000_000, "B", 1))
+    
+    chain = None
+    for threshold, suffix, decimals in suffixes:
+        value = pl.format("{}" + suffix, _fixed(expr / threshold, decimals))
+        chain = (pl.when(expr >= threshold) if chain is None else chain.when(expr >= threshold)).then(value)
+    return chain.otherwise(expr.cast(pl.Utf8))
+
+
+def _format_for_display(df: pl.DataFrame, n: int, billions: bool = False) -> pl.DataFrame:
+    """
+    Take the n riskiest rows and build every table cell as a string column.
     
-    # Retry logic for concurrent writes
-    max_retries = 5
-    for attempt in range(max_retries):
-        try:
-            pdf.to_sql("risk_report_temp", conn, if_exists="replace", index=False)
-            
-            # Create main table from temp if it doesn't exist
-            conn.execute("""
-                CREATE TABLE IF NOT EXISTS risk_report AS 
-                SELECT * FROM risk_report_temp WHERE 0
-            """)
-            
-            # Add unique index on repo if not exists
-            conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_repo ON risk_report(repo)")
-            
-            # Insert or replace
-            cols = ", ".join(pdf.columns)
-            conn.execute(f"""
-                INSERT OR REPLACE INTO risk_report ({cols})
-                SELECT {cols} FROM risk_report_temp
-            """)
-            conn.execute("DROP TABLE risk_report_temp")
-            conn.commit()
-            break
-        except sqlite3.OperationalError as e:
-            if "locked" in str(e).lower() and attempt < max_retries - 1:
-                import time
-                console.print(f"[yellow]Database busy, retrying ({attempt + 1}/{max_retries})...[/yellow]")
-                time.sleep(1.0 * (attempt + 1))  # Exponential backoff
-            else:
-                raise
-    
-    conn.close()
-    console.print(f"\n[dim]Full dataset saved to {output_path} (table: risk_report)[/dim]")
+    All formatting runs as Polars expressions. Styled cells get a matching
+    *_style column holding a key into _STYLES, so the display functions
+    only wrap ready-made strings in Text objects.
+    """
+    na = pl.lit("N/A")
+    unknown = pl.lit("?")
+    dim = pl.lit("dim")
+    plain = pl.lit("")
+    
+    has_gini = pl.col("has_contributor_data") & pl.col("gini_coefficient").is_not_null()
+    
+    # Color coding based on risk level, and on Gini (higher = more concentrated = riskier)
+    level_color = pl.col("risk_level").replace_strict(_LEVEL_COLORS, default="green", return_dtype=pl.Utf8)
+    gini_color = (
+        pl.when(pl.col("gini_coefficient") < 0.5).then(pl.lit("green"))
+          .when(pl.col("gini_coefficient") < 0.75).then(pl.lit("yellow"))
+          .otherwise(pl.lit("red"))
+    )
+    
+    def cell(name: str, available: pl.Expr, value: pl.Expr, style: pl.Expr = plain, missing: pl.Expr = na) -> List[pl.Expr]:
+        return [
+            pl.when(available).then(value).otherwise(missing).alias(f"{name}_str"),
+            pl.when(available).then(style).otherwise(dim).alias(f"{name}_style"),
+        ]
+    
+    def share(name: str, column: str) -> List[pl.Expr]:
+        available = has_gini & pl.col(column).is_not_null()
+        return cell(name, available, pl.format("{}%", _fixed(pl.col(column) * 100, 0)))
+    
+    columns = [
+        # Clickable link to the GitHub repo
+        pl.format("https://github.com/{}", "repo").alias("repo_url"),
+        _fixed(pl.col("total_risk_score"), 1).alias("score_str"),
+        pl.col("risk_level").alias("level_str"),
+        level_color.alias("level_style"),
+        pl.format("{}x", _fixed(pl.col("velocity_ratio"), 2)).alias("velocity_str"),
+        pl.col("language").fill_null("?").alias("lang_str"),
+        pl.col("total_commits").cast(pl.Utf8).alias("commits_str"),
+        pl.col("recent_commits").cast(pl.Utf8).alias("recent_str"),
+        *cell("gini", has_gini, _fixed(pl.col("gini_coefficient"), 2), gini_color),
+        *share("top1", "top1_share"),
+        *share("top3", "top3_share"),
+        *cell(
+            "contrib",
+            has_gini & pl.col("contributor_count").is_not_null(),
+            pl.col("contributor_count").cast(pl.Utf8),
+            missing=unknown,
+        ),
+    ]
+    
+    # Optional package registry fields (NPM, PyPI, Maven)
+    if "package_name" in df.columns:
+        columns.extend(cell("package", pl.col("package_name").fill_null("") != "", pl.col("package_name"), missing=unknown))
+    if "weekly_downloads" in df.columns:
+        columns.append(_format_count(pl.col("weekly_downloads").fill_null(0), billions).alias("dl_str"))
+    
+    # Lazy top-k selects the riskiest rows without sorting the whole frame;
+    # top_k output is unordered, so only those n rows are sorted and formatted
+    return (
+        df.lazy()
+        .top_k(n, by="total_risk_score")
+        .sort("total_risk_score", descending=True)
+        .with_columns(columns)
+        .collect()
+    )
 
 
-@app.command("scan-npm")
-def scan_npm(
-    token: str = typer.Option(..., envvar="GITHUB_TOKEN", help="GitHub PAT"),
-    limit: int = typer.Option(1000, help="Number of top NPM packages to scan"),
-    min_downloads: int = typer.Option(10000, help="Minimum weekly downloads filter"),
-    no_cache: bool = typer.Option(False, help="Skip cache and fetch fresh data from NPM"),
-):
+def _styled(text: str, style: str) -> Text:
+    """Wrap a formatted cell in Text with its pre-parsed style (padding stays unstyled)."""
+    return Text.assemble((text, _STYLES[style]))
+
+
+def _repo_text(repo: str, repo_url: str) -> Text:
+    """Repository name as a clickable link to GitHub."""
+    return Text.assemble((repo, Style(link=repo_url)))
+
+
+# Formatted columns read by the table loops, in cell order
+_SCAN_CELL_COLUMNS = (
+    "repo", "repo_url", "lang_str", "score_str", "level_str", "level_style", "velocity_str",
+    "gini_str", "gini_style", "top1_str", "top1_style", "top3_str", "top3_style",
+    "contrib_str", "contrib_style", "commits_str", "recent_str",
+)
+_REGISTRY_CELL_COLUMNS = (
+    "package_str", "package_style", "repo", "repo_url", "dl_str", "score_str", "level_str", "level_style",
+    "velocity_str", "gini_str", "gini_style", "top1_str", "top1_style", "contrib_str", "contrib_style",
+)
+
+
+def _registry_rows(top_risk: pl.DataFrame) -> Iterator[List[Text]]:
     """
-    Scan top NPM packages for maintainer risk.
+    Cells for each row of an NPM / PyPI / Maven table, all as Text so Rich
+    skips markup parsing. Iterates plain tuples rather than named rows.
+    """
+    for (
+        package, package_style, repo, repo_url, dl, score, level, level_style,
+        velocity, gini, gini_style, top1, top1_style, contrib, contrib_style,
+    ) in top_risk.select(_REGISTRY_CELL_COLUMNS).iter_rows():
+        yield [
+            _styled(package, package_style),
+            _repo_text(repo, repo_url),
+            Text(dl),
+            Text(score),
+            _styled(level, level_style),
+            Text(velocity),
+            _styled(gini, gini_style),
+            _styled(top1, top1_style),
+            _styled(contrib, contrib_style),
+        ]
+
+
+def _display_scan_results(df):
+    """Display GitHub search scan results in a rich table."""
+    table = _new_table("Open Source Maintainer Risk Report", _SCAN_COLUMNS)
     
-    Fetches the most popular NPM packages by downloads, maps them to
-    their GitHub repositories, and analyzes maintainer risk.
+    # Take top 20 riskiest, with all cell strings built in one Polars pass
+    top_risk = _format_for_display(df, 20)
     
-    Note: Packages without a GitHub repository are skipped.
-    """
-    asyncio.run(_scan_npm_async(token, limit, min_downloads, use_cache=not no_cache))
+    for (
+        repo, repo_url, lang, score, level, level_style, velocity, gini, gini_style,
+        top1, top1_style, top3, top3_style, contrib, contrib_style, commits, recent,
+    ) in top_risk.select(_SCAN_CELL_COLUMNS).iter_rows():
+        table.add_row(
+            _repo_text(repo, repo_url),
+            Text(lang),
+            Text(score),
+            _styled(level, level_style),
+            Text(velocity),
+            _styled(gini, gini_style),
+            _styled(top1, top1_style),
+            _styled(top3, top3_style),
+            _styled(contrib, contrib_style),
+            Text(commits),
+            Text(recent),
+        )
+    
+    # Table and legend go out in one buffered write
+    with console:
+        console.print(table)
+        
+        # Legend
+        console.print("\n[bold]Legend:[/bold]")
+        console.print("[dim]• Commits (1Y): Total commits in the last 52 weeks (1 year)[/dim]")
+        console.print("[dim]• Recent (3M): Commits in the last 13 weeks (~3 months)[/dim]")
+        console.print("[dim]• Velocity: Recent (13 wks) vs older (13 wks) commits. >1x = growing, <1x = declining[/dim]")
+        console.print("[dim]• Gini: Contribution inequality (0 = equal, 1 = one person). >0.75 = high concentration[/dim]")
+        console.print("[dim]• Top 1/3: % of commits by top contributors. >50% (top1) or >80% (top3) = bus factor risk[/dim]")
+        console.print("[dim]• Contribs: Total unique contributors. More = lower bus factor risk[/dim]")
+        console.print("[dim]• N/A: GitHub stats still computing or unavailable (retry later)[/dim]")
+
 
+def _package_frame(repo_list: List[Dict[str, Any]]) -> pl.DataFrame:
+    """Build a repo -> package info frame for enriching GitHub results."""
+    return pl.DataFrame(
+        {
+            "repo": [r["name"] for r in repo_list],
+            "package_name": [r.get("package_name") for r in repo_list],
+            "weekly_downloads": [r.get("weekly_downloads", 0) for r in repo_list],
+            "registry": [r.get("registry") for r in repo_list],
+        },
+        schema={"repo": pl.Utf8, "package_name": pl.Utf8, "weekly_downloads": pl.Int64, "registry": pl.Utf8},
+    ).unique(subset="repo", keep="last", maintain_order=True)
 
-async def _scan_npm_async(token: str, limit: int, min_downloads: int, use_cache: bool = True):
-    """Async implementation of the scan-npm command."""
-    npm_client = NPMClient()
-    github_client = GitHubClient(token)
+
+async def _scan_registry(
+    registry_client: PackageRegistryClient,
+    github_client: GitHubClient,
+    limit: int,
+    min_filter: int,
+    use_cache: bool,
+    display_fn: Callable[[pl.DataFrame], None],
+    label: str,
+    filter_label: str,
+    not_found_hint: str = "",
+):
+    """
+    Shared async implementation of the scan-npm, scan-pypi and scan-maven commands.
     
+    min_filter is the registry's popularity threshold (downloads, or
+    dependents for Maven) and filter_label describes it in messages.
+    """
     try:
-        # 1. Fetch popular NPM packages
-        packages = await npm_client.search_popular_packages(
-            max_results=limit,
-            use_cache=use_cache
+        # 1. Fetch popular packages, warming up the GitHub connection meanwhile
+        packages, rate_limit = await asyncio.gather(
+            registry_client.search_popular_packages(
+                max_results=limit,
+                use_cache=use_cache
+            ),
+            github_client.warmup(),
         )
         
+        if rate_limit and rate_limit.get("remaining", 0) < 100:
+            console.print(f"[yellow]Only {rate_limit['remaining']} GitHub API requests left in this rate limit window[/yellow]")
+        
         if not packages:
-            console.print("[red]No NPM packages found.[/red]")
+            console.print(f"[red]No {label} packages found.{not_found_hint}[/red]")
             return
         
         # 2. Filter to GitHub-hosted packages
-        filtered_packages, skipped_count = npm_client.filter_github_packages(
+        filtered_packages, skipped_count = registry_client.filter_github_packages(
             packages, 
-            min_downloads=min_downloads
+            min_downloads=min_filter
         )
         
         if skipped_count > 0:
-            console.print(f"[yellow]Skipped {skipped_count} packages (no GitHub repo or below {min_downloads:,} weekly downloads)[/yellow]")
+            console.print(f"[yellow]Skipped {skipped_count} packages (no GitHub repo or below {min_filter:,} {filter_label})[/yellow]")
         
         if not filtered_packages:
             console.print("[red]No packages with GitHub repositories found.[/red]")
             return
         
         # 3. Convert to repo list format for GitHubClient
-        repo_list = npm_client.to_repo_list(filtered_packages)
-        console.print(f"[bold blue]Scanning {len(repo_list)} NPM packages (from {len(packages)} total)...[/bold blue]")
-        
-        # Create a mapping of repo -> package info for enrichment
-        repo_to_package = {
-            r["name"]: {
-                "package_name": r.get("package_name"),
-                "weekly_downloads": r.get("weekly_downloads", 0),
-                "registry": r.get("registry", "npm"),
-            }
-            for r in repo_list
-        }
-        
-        # 4. Fetch GitHub stats
-        results = await github_client.fetch_batch(repo_list)
+        repo_list = registry_client.to_repo_list(filtered_packages)
+        console.print(f"[bold blue]Scanning {len(repo_list)} {label} packages (from {len(packages)} total)...[/bold blue]")
         
-        # 5. Enrich results with NPM package info
-        for result in results:
-            repo_name = result.get("repo")
-            if repo_name in repo_to_package:
-                result["package_name"] = repo_to_package[repo_name]["package_name"]
-                result["weekly_downloads"] = repo_to_package[repo_name]["weekly_downloads"]
-                result["registry"] = repo_to_package[repo_name]["registry"]
+        pkg_df = _package_frame(repo_list)
         
+        # 4. Fetch GitHub stats, compute risk metrics, enrich with package
+        #    info and export to SQLite as each chunk of repos completes
+        df = await _stream_risk_metrics(github_client, repo_list, "risk_report.db", pkg_df)
+    
     finally:
-        await npm_client.close()
+        await registry_client.close()
         await github_client.close()
     
-    # 6. Process and compute risk metrics
-    df = compute_risk_metrics(results)
-    
     if df.is_empty():
         console.print("[red]No valid data to process.[/red]")
         return
     
-    # 7. Display results
-    _display_npm_results(df)
+    # 5. Display results
+    display_fn(df)
+    _print_saved("risk_report.db")
+
+
+@app.command("scan-npm")
+def scan_npm(
+    token: str = typer.Option(..., envvar="GITHUB_TOKEN", help="GitHub PAT"),
+    limit: int = typer.Option(1000, help="Number of top NPM packages to scan"),
+    min_downloads: int = typer.Option(10000, help="Minimum weekly downloads filter"),
+    no_cache: bool = typer.Option(False, help="Skip cache and fetch fresh data from NPM"),
+):
+    """
+    Scan top NPM packages for maintainer risk.
+    
+    Fetches the most popular NPM packages by downloads, maps them to
+    their GitHub repositories, and analyzes maintainer risk.
     
-    # 8. Export to SQLite
-    _export_to_sqlite(df, "risk_report.db")
+    Note: Packages without a GitHub repository are skipped.
+    """
+    _run(_scan_registry(
+        NPMClient(),
+        GitHubClient(token),
+        limit=limit,
+        min_filter=min_downloads,
+        use_cache=not no_cache,
+        display_fn=_display_npm_results,
+        label="NPM",
+        filter_label="weekly downloads",
+    ))
 
 
 @app.command("scan-pypi")
@@ -313,163 +492,38 @@ def scan_pypi(
     
     Note: Packages without a GitHub repository are skipped.
     """
-    asyncio.run(_scan_pypi_async(token, limit, min_downloads, use_cache=not no_cache))
-
-
-async def _scan_pypi_async(token: str, limit: int, min_downloads: int, use_cache: bool = True):
-    """Async implementation of the scan-pypi command."""
-    pypi_client = PyPIClient()
-    github_client = GitHubClient(token)
-    
-    try:
-        # 1. Fetch popular PyPI packages
-        packages = await pypi_client.search_popular_packages(
-            max_results=limit,
-            use_cache=use_cache
-        )
-        
-        if not packages:
-            console.print("[red]No PyPI packages found.[/red]")
-            return
-        
-        # 2. Filter to GitHub-hosted packages
-        filtered_packages, skipped_count = pypi_client.filter_github_packages(
-            packages, 
-            min_downloads=min_downloads
-        )
-        
-        if skipped_count > 0:
-            console.print(f"[yellow]Skipped {skipped_count} packages (no GitHub repo or below {min_downloads:,} monthly downloads)[/yellow]")
-        
-        if not filtered_packages:
-            console.print("[red]No packages with GitHub repositories found.[/red]")
-            return
-        
-        # 3. Convert to repo list format for GitHubClient
-        repo_list = pypi_client.to_repo_list(filtered_packages)
-        console.print(f"[bold blue]Scanning {len(repo_list)} PyPI packages (from {len(packages)} total)...[/bold blue]")
-        
-        # Create a mapping of repo -> package info for enrichment
-        repo_to_package = {
-            r["name"]: {
-                "package_name": r.get("package_name"),
-                "weekly_downloads": r.get("weekly_downloads", 0),
-                "registry": r.get("registry", "pypi"),
-            }
-            for r in repo_list
-        }
-        
-        # 4. Fetch GitHub stats
-        results = await github_client.fetch_batch(repo_list)
-        
-        # 5. Enrich results with PyPI package info
-        for result in results:
-            repo_name = result.get("repo")
-            if repo_name in repo_to_package:
-                result["package_name"] = repo_to_package[repo_name]["package_name"]
-                result["weekly_downloads"] = repo_to_package[repo_name]["weekly_downloads"]
-                result["registry"] = repo_to_package[repo_name]["registry"]
-        
-    finally:
-        await pypi_client.close()
-        await github_client.close()
-    
-    # 6. Process and compute risk metrics
-    df = compute_risk_metrics(results)
-    
-    if df.is_empty():
-        console.print("[red]No valid data to process.[/red]")
-        return
-    
-    # 7. Display results
-    _display_pypi_results(df)
-    
-    # 8. Export to SQLite
-    _export_to_sqlite(df, "risk_report.db")
+    _run(_scan_registry(
+        PyPIClient(),
+        GitHubClient(token),
+        limit=limit,
+        min_filter=min_downloads,
+        use_cache=not no_cache,
+        display_fn=_display_pypi_results,
+        label="PyPI",
+        filter_label="monthly downloads",
+    ))
 
 
 def _display_pypi_results(df):
     """Display PyPI scan results in a rich table."""
-    table = Table(title="PyPI Package Maintainer Risk Report")
-    
-    table.add_column("Package", style="cyan", no_wrap=True)
-    table.add_column("Repository", style="dim")
-    table.add_column("Downloads/mo", justify="right")
-    table.add_column("Risk", justify="right")
-    table.add_column("Level", justify="center")
-    table.add_column("Velocity", justify="right")
-    table.add_column("Gini", justify="right")
-    table.add_column("Top 1", justify="right")
-    table.add_column("Contribs", justify="right")
-    
-    # Take top 30 riskiest
-    top_risk = df.head(30)
-    
-    for row in top_risk.iter_rows(named=True):
-        # Color coding the output based on risk level
-        level_color = "green"
-        if row["risk_level"] == "CRITICAL":
-            level_color = "red bold"
-        elif row["risk_level"] == "HIGH":
-            level_color = "orange1"
-        elif row["risk_level"] == "MEDIUM":
-            level_color = "yellow"
-        
-        # Check if we have valid contributor data
-        has_contributor_data = row.get("contributor_data_available", False) or (
-            row["contributor_count"] is not None and 
-            row["gini_coefficient"] is not None
-        )
-        
-        # Format Gini
-        if has_contributor_data and row["gini_coefficient"] is not None:
-            gini = row["gini_coefficient"]
-            gini_color = "green" if gini < 0.5 else "yellow" if gini < 0.75 else "red"
-            gini_str = f"[{gini_color}]{gini:.2f}[/{gini_color}]"
-            top1_str = f"{row['top1_share']:.0%}" if row['top1_share'] is not None else "[dim]N/A[/dim]"
-            contrib_str = str(row["contributor_count"]) if row["contributor_count"] is not None else "[dim]?[/dim]"
-        else:
-            gini_str = "[dim]N/A[/dim]"
-            top1_str = "[dim]N/A[/dim]"
-            contrib_str = "[dim]?[/dim]"
-        
-        # Package name and repo link
-        package_name = row.get("package_name", "")
-        repo_name = row["repo"]
-        repo_url = f"https://github.com/{repo_name}"
-        repo_link = f"[link={repo_url}]{repo_name}[/link]"
-        
-        # Format downloads (monthly for PyPI)
-        downloads = row.get("weekly_downloads", 0)
-        if downloads >= 1_000_000_000:
-            dl_str = f"{downloads / 1_000_000_000:.1f}B"
-        elif downloads >= 1_000_000:
-            dl_str = f"{downloads / 1_000_000:.1f}M"
-        elif downloads >= 1_000:
-            dl_str = f"{downloads / 1_000:.0f}K"
-        else:
-            dl_str = str(downloads)
-        
-        table.add_row(
-            package_name or "[dim]?[/dim]",
-            repo_link,
-            dl_str,
-            f"{row['total_risk_score']:.1f}",
-            f"[{level_color}]{row['risk_level']}[/{level_color}]",
-            f"{row['velocity_ratio']:.2f}x",
-            gini_str,
-            top1_str,
-            contrib_str,
-        )
+    table = _new_table("PyPI Package Maintainer Risk Report", _REGISTRY_COLUMNS, count_header="Downloads/mo")
+    
+    # Take top 30 riskiest, with all cell strings built in one Polars pass
+    top_risk = _format_for_display(df, 30, billions=True)
     
-    console.print(table)
+    for cells in _registry_rows(top_risk):
+        table.add_row(*cells)
     
-    # Legend
-    console.print("\n[bold]Legend:[/bold]")
-    console.print("[dim]• Downloads/mo: Monthly PyPI downloads (higher = more critical if risky)[/dim]")
-    console.print("[dim]• Velocity: Recent (13 wks) vs older (13 wks) commits. >1x = growing, <1x = declining[/dim]")
-    console.print("[dim]• Gini: Contribution inequality (0 = equal, 1 = one person). >0.75 = high concentration[/dim]")
-    console.print("[dim]• Top 1: % of commits by top contributor. >50% = bus factor risk[/dim]")
+    # Table and legend go out in one buffered write
+    with console:
+        console.print(table)
+        
+        # Legend
+        console.print("\n[bold]Legend:[/bold]")
+        console.print("[dim]• Downloads/mo: Monthly PyPI downloads (higher = more critical if risky)[/dim]")
+        console.print("[dim]• Velocity: Recent (13 wks) vs older (13 wks) commits. >1x = growing, <1x = declining[/dim]")
+        console.print("[dim]• Gini: Contribution inequality (0 = equal, 1 = one person). >0.75 = high concentration[/dim]")
+        console.print("[dim]• Top 1: % of commits by top contributor. >50% = bus factor risk[/dim]")
 
 
 @app.command("scan-maven")
@@ -492,295 +546,199 @@ def scan_maven(
     
     Note: Packages without a GitHub repository are skipped.
     """
-    asyncio.run(_scan_maven_async(token, limit, min_dependents, use_cache=not no_cache, api_key=api_key))
-
-
-async def _scan_maven_async(
-    token: str, 
-    limit: int, 
-    min_dependents: int, 
-    use_cache: bool = True,
-    api_key: Optional[str] = None
-):
-    """Async implementation of the scan-maven command."""
-    maven_client = MavenClient(api_key=api_key)
-    github_client = GitHubClient(token)
-    
-    try:
-        # 1. Fetch popular Maven packages
-        packages = await maven_client.search_popular_packages(
-            max_results=limit,
-            use_cache=use_cache
-        )
-        
-        if not packages:
-            console.print("[red]No Maven packages found. Check your Libraries.io API key.[/red]")
-            return
-        
-        # 2. Filter to GitHub-hosted packages
-        filtered_packages, skipped_count = maven_client.filter_github_packages(
-            packages, 
-            min_downloads=min_dependents  # Uses dependents_count internally
-        )
-        
-        if skipped_count > 0:
-            console.print(f"[yellow]Skipped {skipped_count} packages (no GitHub repo or below {min_dependents:,} dependents)[/yellow]")
-        
-        if not filtered_packages:
-            console.print("[red]No packages with GitHub repositories found.[/red]")
-            return
-        
-        # 3. Convert to repo list format for GitHubClient
-        repo_list = maven_client.to_repo_list(filtered_packages)
-        console.print(f"[bold blue]Scanning {len(repo_list)} Maven packages (from {len(packages)} total)...[/bold blue]")
-        
-        # Create a mapping of repo -> package info for enrichment
-        repo_to_package = {
-            r["name"]: {
-                "package_name": r.get("package_name"),
-                "weekly_downloads": r.get("weekly_downloads", 0),  # Actually dependents_count
-                "registry": r.get("registry", "maven"),
-            }
-            for r in repo_list
-        }
-        
-        # 4. Fetch GitHub stats
-        results = await github_client.fetch_batch(repo_list)
-        
-        # 5. Enrich results with Maven package info
-        for result in results:
-            repo_name = result.get("repo")
-            if repo_name in repo_to_package:
-                result["package_name"] = repo_to_package[repo_name]["package_name"]
-                result["weekly_downloads"] = repo_to_package[repo_name]["weekly_downloads"]
-                result["registry"] = repo_to_package[repo_name]["registry"]
-        
-    finally:
-        await maven_client.close()
-        await github_client.close()
-    
-    # 6. Process and compute risk metrics
-    df = compute_risk_metrics(results)
-    
-    if df.is_empty():
-        console.print("[red]No valid data to process.[/red]")
-        return
-    
-    # 7. Display results
-    _display_maven_results(df)
-    
-    # 8. Export to SQLite
-    _export_to_sqlite(df, "risk_report.db")
+    _run(_scan_registry(
+        MavenClient(api_key=api_key),
+        GitHubClient(token),
+        limit=limit,
+        min_filter=min_dependents,  # Uses dependents_count internally
+        use_cache=not no_cache,
+        display_fn=_display_maven_results,
+        label="Maven",
+        filter_label="dependents",
+        not_found_hint=" Check your Libraries.io API key.",
+    ))
 
 
 def _display_maven_results(df):
     """Display Maven scan results in a rich table."""
-    table = Table(title="Maven Package Maintainer Risk Report")
-    
-    table.add_column("Package", style="cyan", no_wrap=True)
-    table.add_column("Repository", style="dim")
-    table.add_column("Dependents", justify="right")
-    table.add_column("Risk", justify="right")
-    table.add_column("Level", justify="center")
-    table.add_column("Velocity", justify="right")
-    table.add_column("Gini", justify="right")
-    table.add_column("Top 1", justify="right")
-    table.add_column("Contribs", justify="right")
-    
-    # Take top 30 riskiest
-    top_risk = df.head(30)
-    
-    for row in top_risk.iter_rows(named=True):
-        # Color coding the output based on risk level
-        level_color = "green"
-        if row["risk_level"] == "CRITICAL":
-            level_color = "red bold"
-        elif row["risk_level"] == "HIGH":
-            level_color = "orange1"
-        elif row["risk_level"] == "MEDIUM":
-            level_color = "yellow"
-        
-        # Check if we have valid contributor data
-        has_contributor_data = row.get("contributor_data_available", False) or (
-            row["contributor_count"] is not None and 
-            row["gini_coefficient"] is not None
-        )
-        
-        # Format Gini
-        if has_contributor_data and row["gini_coefficient"] is not None:
-            gini = row["gini_coefficient"]
-            gini_color = "green" if gini < 0.5 else "yellow" if gini < 0.75 else "red"
-            gini_str = f"[{gini_color}]{gini:.2f}[/{gini_color}]"
-            top1_str = f"{row['top1_share']:.0%}" if row['top1_share'] is not None else "[dim]N/A[/dim]"
-            contrib_str = str(row["contributor_count"]) if row["contributor_count"] is not None else "[dim]?[/dim]"
-        else:
-            gini_str = "[dim]N/A[/dim]"
-            top1_str = "[dim]N/A[/dim]"
-            contrib_str = "[dim]?[/dim]"
-        
-        # Package name and repo link
-        package_name = row.get("package_name", "")
-        repo_name = row["repo"]
-        repo_url = f"https://github.com/{repo_name}"
-        repo_link = f"[link={repo_url}]{repo_name}[/link]"
-        
-        # Format dependents count
-        dependents = row.get("weekly_downloads", 0)
-        if dependents >= 1_000_000:
-            dep_str = f"{dependents / 1_000_000:.1f}M"
-        elif dependents >= 1_000:
-            dep_str = f"{dependents / 1_000:.0f}K"
-        else:
-            dep_str = str(dependents)
-        
-        table.add_row(
-            package_name or "[dim]?[/dim]",
-            repo_link,
-            dep_str,
-            f"{row['total_risk_score']:.1f}",
-            f"[{level_color}]{row['risk_level']}[/{level_color}]",
-            f"{row['velocity_ratio']:.2f}x",
-            gini_str,
-            top1_str,
-            contrib_str,
-        )
+    table = _new_table("Maven Package Maintainer Risk Report", _REGISTRY_COLUMNS, count_header="Dependents")
     
-    console.print(table)
+    # Take top 30 riskiest, with all cell strings built in one Polars pass
+    top_risk = _format_for_display(df, 30)
     
-    # Legend
-    console.print("\n[bold]Legend:[/bold]")
-    console.print("[dim]• Dependents: Number of packages depending on this (from Libraries.io)[/dim]")
-    console.print("[dim]• Velocity: Recent (13 wks) vs older (13 wks) commits. >1x = growing, <1x = declining[/dim]")
-    console.print("[dim]• Gini: Contribution inequality (0 = equal, 1 = one person). >0.75 = high concentration[/dim]")
-    console.print("[dim]• Top 1: % of commits by top contributor. >50% = bus factor risk[/dim]")
+    for cells in _registry_rows(top_risk):
+        table.add_row(*cells)
+    
+    # Table and legend go out in one buffered write
+    with console:
+        console.print(table)
+        
+        # Legend
+        console.print("\n[bold]Legend:[/bold]")
+        console.print("[dim]• Dependents: Number of packages depending on this (from Libraries.io)[/dim]")
+        console.print("[dim]• Velocity: Recent (13 wks) vs older (13 wks) commits. >1x = growing, <1x = declining[/dim]")
+        console.print("[dim]• Gini: Contribution inequality (0 = equal, 1 = one person). >0.75 = high concentration[/dim]")
+        console.print("[dim]• Top 1: % of commits by top contributor. >50% = bus factor risk[/dim]")
 
 
 def _display_npm_results(df):
     """Display NPM scan results in a rich table."""
-    table = Table(title="NPM Package Maintainer Risk Report")
-    
-    table.add_column("Package", style="cyan", no_wrap=True)
-    table.add_column("Repository", style="dim")
-    table.add_column("Downloads/wk", justify="right")
-    table.add_column("Risk", justify="right")
-    table.add_column("Level", justify="center")
-    table.add_column("Velocity", justify="right")
-    table.add_column("Gini", justify="right")
-    table.add_column("Top 1", justify="right")
-    table.add_column("Contribs", justify="right")
-    
-    # Take top 30 riskiest
-    top_risk = df.head(30)
-    
-    for row in top_risk.iter_rows(named=True):
-        # Color coding the output based on risk level
-        level_color = "green"
-        if row["risk_level"] == "CRITICAL":
-            level_color = "red bold"
-        elif row["risk_level"] == "HIGH":
-            level_color = "orange1"
-        elif row["risk_level"] == "MEDIUM":
-            level_color = "yellow"
-        
-        # Check if we have valid contributor data
-        has_contributor_data = row.get("contributor_data_available", False) or (
-            row["contributor_count"] is not None and 
-            row["gini_coefficient"] is not None
-        )
-        
-        # Format Gini
-        if has_contributor_data and row["gini_coefficient"] is not None:
-            gini = row["gini_coefficient"]
-            gini_color = "green" if gini < 0.5 else "yellow" if gini < 0.75 else "red"
-            gini_str = f"[{gini_color}]{gini:.2f}[/{gini_color}]"
-            top1_str = f"{row['top1_share']:.0%}" if row['top1_share'] is not None else "[dim]N/A[/dim]"
-            contrib_str = str(row["contributor_count"]) if row["contributor_count"] is not None else "[dim]?[/dim]"
-        else:
-            gini_str = "[dim]N/A[/dim]"
-            top1_str = "[dim]N/A[/dim]"
-            contrib_str = "[dim]?[/dim]"
-        
-        # Package name and repo link
-        package_name = row.get("package_name", "")
-        repo_name = row["repo"]
-        repo_url = f"https://github.com/{repo_name}"
-        repo_link = f"[link={repo_url}]{repo_name}[/link]"
-        
-        # Format downloads
-        downloads = row.get("weekly_downloads", 0)
-        if downloads >= 1_000_000:
-            dl_str = f"{downloads / 1_000_000:.1f}M"
-        elif downloads >= 1_000:
-            dl_str = f"{downloads / 1_000:.0f}K"
-        else:
-            dl_str = str(downloads)
-        
-        table.add_row(
-            package_name or "[dim]?[/dim]",
-            repo_link,
-            dl_str,
-            f"{row['total_risk_score']:.1f}",
-            f"[{level_color}]{row['risk_level']}[/{level_color}]",
-            f"{row['velocity_ratio']:.2f}x",
-            gini_str,
-            top1_str,
-            contrib_str,
-        )
+    table = _new_table("NPM Package Maintainer Risk Report", _REGISTRY_COLUMNS, count_header="Downloads/wk")
+    
+    # Take top 30 riskiest, with all cell strings built in one Polars pass
+    top_risk = _format_for_display(df, 30)
     
-    console.print(table)
+    for cells in _registry_rows(top_risk):
+        table.add_row(*cells)
     
-    # Legend
-    console.print("\n[bold]Legend:[/bold]")
-    console.print("[dim]• Downloads/wk: Weekly NPM downloads (higher = more critical if risky)[/dim]")
-    console.print("[dim]• Velocity: Recent (13 wks) vs older (13 wks) commits. >1x = growing, <1x = declining[/dim]")
-    console.print("[dim]• Gini: Contribution inequality (0 = equal, 1 = one person). >0.75 = high concentration[/dim]")
-    console.print("[dim]• Top 1: % of commits by top contributor. >50% = bus factor risk[/dim]")
+    # Table and legend go out in one buffered write
+    with console:
+        console.print(table)
+        
+        # Legend
+        console.print("\n[bold]Legend:[/bold]")
+        console.print("[dim]• Downloads/wk: Weekly NPM downloads (higher = more critical if risky)[/dim]")
+        console.print("[dim]• Velocity: Recent (13 wks) vs older (13 wks) commits. >1x = growing, <1x = declining[/dim]")
+        console.print("[dim]• Gini: Contribution inequality (0 = equal, 1 = one person). >0.75 = high concentration[/dim]")
+        console.print("[dim]• Top 1: % of commits by top contributor. >50% = bus factor risk[/dim]")
 
 
-def _export_to_sqlite(df, output_path: str):
-    """Export DataFrame to SQLite with upsert logic."""
-    import sqlite3
-    
+# Pinned risk_report schema. The table is created from this rather than from
+# each frame's dtypes, which can differ between chunks (e.g. all-null columns).
+_EXPORT_SCHEMA = {
+    "repo": "TEXT",
+    "language": "TEXT",
+    "all_commits": "TEXT",
+    "contributor_count": "INTEGER",
+    "contributor_data_available": "INTEGER",
+    "gini_coefficient": "REAL",
+    "top1_share": "REAL",
+    "top3_share": "REAL",
+    "package_name": "TEXT",
+    "weekly_downloads": "INTEGER",
+    "registry": "TEXT",
+    "total_commits": "INTEGER",
+    "recent_commits": "INTEGER",
+    "older_commits": "INTEGER",
+    "velocity_ratio": "REAL",
+    "risk_velocity": "REAL",
+    "risk_gini": "REAL",
+    "risk_concentration": "REAL",
+    "risk_bus_factor": "REAL",
+    "total_risk_score": "REAL",
+    "risk_level": "TEXT",
+    "updated_at": "TEXT",
+}
+
+
+def _connect_sqlite(output_path: str) -> sqlite3.Connection:
+    """Open the report database, tuned for bulk upserts."""
     # Use WAL mode for better concurrent access
-    conn = sqlite3.connect(output_path, timeout=30.0)
+    # isolation_level=None leaves transaction control to the explicit BEGIN/COMMIT in _upsert_rows
+    # check_same_thread=False lets worker threads write; callers use one thread at a time
+    conn = sqlite3.connect(output_path, timeout=60.0, isolation_level=None, check_same_thread=False)
     conn.execute("PRAGMA journal_mode=WAL")
-    conn.execute("PRAGMA busy_timeout=30000")
+    conn.execute("PRAGMA busy_timeout=60000")
+    # NORMAL is safe under WAL and only fsyncs on checkpoint, not on every commit
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA cache_size=-65536")  # 64 MiB
+    conn.execute("PRAGMA mmap_size=268435456")  # 256 MiB
+    conn.execute("PRAGMA wal_autocheckpoint=1000")
+    conn.execute("PRAGMA journal_size_limit=67108864")  # 64 MiB
+    return conn
+
+
+def _close_sqlite(conn: sqlite3.Connection):
+    """Checkpoint and truncate the WAL so the next reader opens a clean database file."""
+    try:
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    finally:
+        conn.close()
+
+
+def _ensure_schema(conn: sqlite3.Connection):
+    """
+    Create risk_report (with its unique repo index) or add missing columns.
     
-    pdf = df.to_pandas()
-    pdf["updated_at"] = pd.Timestamp.now()
+    Reads the table layout first, so a table that already matches costs
+    no DDL at all.
+    """
+    existing = {row[1] for row in conn.execute("PRAGMA table_info(risk_report)")}
+    if not existing:
+        column_defs = ", ".join(f"{name} {sql_type}" for name, sql_type in _EXPORT_SCHEMA.items())
+        conn.execute(f"CREATE TABLE risk_report ({column_defs})")
+        conn.execute("CREATE UNIQUE INDEX idx_repo ON risk_report(repo)")
+        return
     
-    # Retry logic for concurrent writes
-    max_retries = 5
-    for attempt in range(max_retries):
-        try:
-            pdf.to_sql("risk_report_temp", conn, if_exists="replace", index=False)
-            
-            conn.execute("""
-                CREATE TABLE IF NOT EXISTS risk_report AS 
-                SELECT * FROM risk_report_temp WHERE 0
-            """)
-            
-            conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_repo ON risk_report(repo)")
-            
-            cols = ", ".join(pdf.columns)
-            conn.execute(f"""
-                INSERT OR REPLACE INTO risk_report ({cols})
-                SELECT {cols} FROM risk_report_temp
-            """)
-            conn.execute("DROP TABLE risk_report_temp")
-            conn.commit()
-            break
-        except sqlite3.OperationalError as e:
-            if "locked" in str(e).lower() and attempt < max_retries - 1:
-                import time
-                console.print(f"[yellow]Database busy, retrying ({attempt + 1}/{max_retries})...[/yellow]")
-                time.sleep(1.0 * (attempt + 1))
-            else:
-                raise
-    
-    conn.close()
+    # Add columns missing from an older table (e.g. registry fields after a GitHub-only scan)
+    for name, sql_type in _EXPORT_SCHEMA.items():
+        if name not in existing:
+            conn.execute(f"ALTER TABLE risk_report ADD COLUMN {name} {sql_type}")
+
+
+@functools.lru_cache(maxsize=None)
+def _upsert_sql(columns: Tuple[str, ...]) -> str:
+    """
+    Build the upsert statement for a column set.
+    
+    Columns always arrive in _EXPORT_SCHEMA order, so there are only a couple
+    of distinct statements (with and without registry fields). Each is built
+    once, and the identical SQL text keeps hitting sqlite3's statement cache.
+    """
+    cols = ", ".join(columns)
+    placeholders = ", ".join("?" * len(columns))
+    updates = ", ".join(f"{name} = excluded.{name}" for name in columns if name != "repo")
+    return f"INSERT INTO risk_report ({cols}) VALUES ({placeholders}) ON CONFLICT(repo) DO UPDATE SET {updates}"
+
+
+def _upsert_rows(conn: sqlite3.Connection, df: pl.DataFrame):
+    """Upsert DataFrame rows into the risk_report table, keyed by repo."""
+    # Only persist report columns; registry fields are present for registry scans only
+    df = df.select([name for name in _EXPORT_SCHEMA if name in df.columns and name != "updated_at"])
+    
+    # List columns (weekly commit counts) are stored as "[1,2,...]" text
+    df = df.with_columns(
+        [
+            pl.format("[{}]", pl.col(name).cast(pl.List(pl.Utf8)).list.join(",")).alias(name)
+            for name, dtype in df.schema.items()
+            if isinstance(dtype, pl.List)
+        ]
+        + [pl.lit(datetime.now().isoformat(sep=" ")).alias("updated_at")]
+    )
+    
+    upsert_sql = _upsert_sql(tuple(df.columns))
+    
+    # Lock waits are left to SQLite's busy handler (busy_timeout), which
+    # retries in C instead of a Python sleep-and-retry loop
+    try:
+        # One write transaction for any schema setup and all rows
+        conn.execute("BEGIN IMMEDIATE")
+        _ensure_schema(conn)
+        
+        # Upsert in place (repo as unique key) instead of delete + reinsert
+        conn.executemany(upsert_sql, df.iter_rows())
+        conn.execute("COMMIT")
+    except sqlite3.Error:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        raise
+
+
+def _print_saved(output_path: str):
+    """Tell the user where the full dataset was written."""
     console.print(f"\n[dim]Full dataset saved to {output_path} (table: risk_report)[/dim]")
 
 
+def _export_to_sqlite(df, output_path: str):
+    """Export DataFrame to SQLite with upsert logic."""
+    conn = _connect_sqlite(output_path)
+    try:
+        _upsert_rows(conn, df)
+    finally:
+        _close_sqlite(conn)
+    _print_saved(output_path)
+
+
 if __name__ == "__main__":
     app()
@@ -1,11 +1,14 @@
 import sqlite3
 import webbrowser
+from collections import namedtuple
+from functools import partial
 from textual.app import App, ComposeResult
 from textual.widgets import DataTable, Header, Footer, Input, Static
 from textual.binding import Binding
 from textual.containers import Vertical, Horizontal, Center
 from textual.screen import ModalScreen
 from textual import events
+from textual.timer import Timer
 
 
 HELP_TEXT = """\
@@ -59,6 +62,33 @@ HELP_TEXT = """\
 """
 
 
+# Risk level -> styled markup, built once rather than per rendered row
+LEVEL_STYLES = {
+    "CRITICAL": "[red bold]CRITICAL[/]",
+    "HIGH": "[orange1]HIGH[/]",
+    "MEDIUM": "[yellow]MEDIUM[/]",
+    "LOW": "[green]LOW[/]",
+}
+
+
+# Columns the explorer can sort by; each has an index so ORDER BY can walk it.
+# repo is already covered by the exporter's unique idx_repo.
+SORT_COLUMNS = ("total_risk_score", "contributor_count", "repo", "weekly_downloads")
+INDEXED_COLUMNS = ("total_risk_score", "contributor_count", "weekly_downloads", "risk_level", "registry")
+
+# Seconds of typing pause before the search is applied
+SEARCH_DEBOUNCE = 0.15
+
+# One explorer row; the field names double as the queried column list
+RiskRow = namedtuple("RiskRow", """
+    rowid repo language total_risk_score risk_level velocity_ratio
+    gini_coefficient top1_share top3_share contributor_count
+    total_commits recent_commits updated_at
+    weekly_downloads registry package_name
+""")
+ROW_COLUMNS = ", ".join(RiskRow._fields)
+
+
 class HelpScreen(ModalScreen):
     """A modal screen showing help information."""
     
@@ -174,9 +204,15 @@ class RiskExplorer(App):
     def __init__(self, db_path: str = "risk_report.db"):
         super().__init__()
         self.db_path = db_path
-        self.all_data = []
+        self.conn: sqlite3.Connection | None = None
         self.filtered_data = []
         self.total_db_rows = 0
+        self.search = ""
+        self.has_fts = False
+        self._filter_timer: Timer | None = None
+        self._cell_cache: dict[int, tuple] = {}
+        self._displayed_keys: set[str] = set()
+        self._table_stale = False
         self.sort_column = "total_risk_score"
         self.sort_reverse = True
         self.registry_filter = None  # None = all, or "npm", "pypi", "maven"
@@ -199,33 +235,135 @@ class RiskExplorer(App):
         self.setup_table()
         self.refresh_table()
     
+    def on_unmount(self) -> None:
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+    
     def load_data(self) -> None:
-        """Load data from SQLite database."""
+        """
+        Open the SQLite database and count its rows.
+        
+        The connection stays open; filtering and sorting are left to
+        SQLite queries issued by fetch_page.
+        """
+        # Freshly loaded rows must be re-formatted and re-added
+        self._cell_cache.clear()
+        self._table_stale = True
         try:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row
+            if self.conn is None:
+                self.conn = sqlite3.connect(self.db_path)
+                # Read-side tuning, applied once for the app's lifetime. The exporter
+                # already puts the file in WAL mode, so the journal mode is left alone.
+                self.conn.execute("PRAGMA mmap_size=268435456")  # 256 MiB
+                self.conn.execute("PRAGMA cache_size=-65536")  # 64 MiB
+                self.conn.execute("PRAGMA temp_store=MEMORY")  # keeps the FTS index and sorts in RAM
             
             # Get total row count in database
-            count_cursor = conn.execute("SELECT COUNT(*) FROM risk_report")
+            count_cursor = self.conn.execute("SELECT COUNT(*) FROM risk_report")
             self.total_db_rows = count_cursor.fetchone()[0]
-            
-            cursor = conn.execute("""
-                SELECT repo, language, total_risk_score, risk_level, velocity_ratio, 
-                       gini_coefficient, top1_share, top3_share, contributor_count,
-                       total_commits, recent_commits, updated_at,
-                       weekly_downloads, registry, package_name
-                FROM risk_report
-                ORDER BY total_risk_score DESC
-            """)
-            self.all_data = [dict(row) for row in cursor.fetchall()]
-            self.filtered_data = self.all_data.copy()
-            conn.close()
+            self._create_indexes()
+            self._build_search_index()
         except sqlite3.OperationalError as e:
-            self.all_data = []
-            self.filtered_data = []
             self.total_db_rows = 0
             self.notify(f"Database error: {e}", severity="error")
     
+    def _create_indexes(self) -> None:
+        """Index the sort and filter columns (a no-op once they exist)."""
+        try:
+            for column in INDEXED_COLUMNS:
+                self.conn.execute(f"CREATE INDEX IF NOT EXISTS idx_risk_report_{column} ON risk_report({column})")
+            self.conn.commit()
+        except sqlite3.OperationalError:
+            # Read-only or locked database: queries still work, just without the indexes
+            self.conn.rollback()
+    
+    def _build_search_index(self) -> None:
+        """
+        (Re)build a trigram FTS5 index over the searchable text columns.
+        
+        The index lives in the connection's temp schema rather than the
+        report database, so it never goes stale under later scans and the
+        explorer doesn't write FTS tables into the user's file. A trigram
+        tokenizer keeps the case-insensitive substring semantics of the search.
+        """
+        try:
+            self.conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS temp.risk_report_fts "
+                "USING fts5(repo, package_name, risk_level, tokenize='trigram')"
+            )
+            self.conn.execute("DELETE FROM temp.risk_report_fts")
+            self.conn.execute("""
+                INSERT INTO temp.risk_report_fts(rowid, repo, package_name, risk_level)
+                SELECT rowid, repo, package_name, risk_level FROM risk_report
+            """)
+            self.conn.commit()
+            self.has_fts = True
+        except sqlite3.OperationalError:
+            # SQLite built without FTS5: fall back to LIKE scans
+            self.conn.rollback()
+            self.has_fts = False
+    
+    def _where_clause(self) -> tuple[str, list]:
+        """Build the WHERE clause and parameters for the registry filter and search."""
+        clauses, params = [], []
+        if self.registry_filter:
+            clauses.append("registry = ?")
+            params.append(self.registry_filter)
+        if self.search and self.has_fts and len(self.search) >= 3:
+            # Trigram index lookup; the search is quoted as one FTS5 phrase
+            clauses.append("rowid IN (SELECT rowid FROM temp.risk_report_fts WHERE risk_report_fts MATCH ?)")
+            params.append('"' + self.search.replace('"', '""') + '"')
+        elif self.search:
+            # Too short for trigrams (or no FTS5): substring match, escaping LIKE wildcards
+            escaped = self.search.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            pattern = f"%{escaped}%"
+            clauses.append(
+                "(repo LIKE ? ESCAPE '\\' OR package_name LIKE ? ESCAPE '\\' OR risk_level LIKE ? ESCAPE '\\')"
+            )
+            params.extend([pattern, pattern, pattern])
+        return (f"WHERE {' AND '.join(clauses)}" if clauses else ""), params
+    
+    def fetch_page(self, offset: int = 0, limit: int = -1) -> list[RiskRow]:
+        """
+        Fetch matching rows in the current sort order.
+        
+        The sort column is checked against SORT_COLUMNS before being put
+        into the SQL; a negative limit returns every matching row.
+        """
+        if self.conn is None:
+            return []
+        column = self.sort_column if self.sort_column in SORT_COLUMNS else "total_risk_score"
+        direction = "DESC" if self.sort_reverse else "ASC"
+        # Break ties by rowid so the order is stable; the column index already
+        # holds equal keys in rowid order, so this needs no extra sort
+        order_by = f"{column} {direction}, rowid {direction}"
+        where, params = self._where_clause()
+        try:
+            cursor = self.conn.execute(
+                f"SELECT {ROW_COLUMNS} FROM risk_report {where} ORDER BY {order_by} LIMIT ? OFFSET ?",
+                [*params, limit, offset],
+            )
+            # Plain tuples from sqlite3, wrapped once in a namedtuple
+            return list(map(RiskRow._make, cursor))
+        except sqlite3.OperationalError:
+            return []
+    
+    def _level_counts(self) -> tuple[int, int]:
+        """Count CRITICAL and HIGH rows matching the current filter."""
+        if self.conn is None:
+            return 0, 0
+        where, params = self._where_clause()
+        try:
+            critical, high = self.conn.execute(
+                f"SELECT COALESCE(SUM(risk_level = 'CRITICAL'), 0), COALESCE(SUM(risk_level = 'HIGH'), 0) "
+                f"FROM risk_report {where}",
+                params,
+            ).fetchone()
+        except sqlite3.OperationalError:
+            return 0, 0
+        return critical, high
+    
     def setup_table(self) -> None:
         """Setup the data table columns."""
         table = self.query_one("#table", DataTable)
@@ -246,79 +384,43 @@ class RiskExplorer(App):
         table.add_column("Commits(1Y)", key="commits", width=11)
     
     def refresh_table(self) -> None:
-        """Refresh the table with current filtered data."""
+        """
+        Re-query the filtered, sorted rows and update the table.
+        
+        Rows already on screen are kept (keyed by rowid): a sort change only
+        reorders them and widening a filter only adds the new rows. Any
+        removal rebuilds the table, as DataTable.remove_row is O(rows) per call.
+        """
         table = self.query_one("#table", DataTable)
-        table.clear()
+        self.filtered_data = self.fetch_page()
+        keys = [str(row.rowid) for row in self.filtered_data]
+        new_keys = set(keys)
         
-        # Sort data
-        self.filtered_data.sort(
-            key=lambda x: x.get(self.sort_column, 0) or 0,
-            reverse=self.sort_reverse
-        )
+        kept = not self._table_stale and self._displayed_keys <= new_keys
+        if not kept:
+            table.clear()
+            self._displayed_keys = set()
+            self._table_stale = False
         
-        for row in self.filtered_data:
-            level = row.get("risk_level", "?")
-            level_styled = self._style_level(level)
-            
-            # Handle None values for contributor metrics
-            gini = row.get('gini_coefficient')
-            gini_str = f"{gini:.2f}" if gini is not None else "N/A"
-            top1 = row.get('top1_share')
-            top1_str = f"{top1:.0%}" if top1 is not None else "N/A"
-            contrib = row.get('contributor_count')
-            contrib_str = (str(contrib) if int(contrib) != 100 else ">100") if contrib is not None else "?"
-            
-            # Source (registry)
-            registry = row.get('registry')
-            source_str = registry.upper() if registry else "GH"
-            
-            # Format downloads (weekly) - only for NPM/PyPI
-            downloads = row.get('weekly_downloads')
-            if registry == 'maven':
-                # Maven doesn't have download stats, show dash
-                dl_str = "-"
-            elif downloads is not None and downloads > 0:
-                if downloads >= 1_000_000:
-                    dl_str = f"{downloads / 1_000_000:.1f}M"
-                elif downloads >= 1_000:
-                    dl_str = f"{downloads / 1_000:.0f}K"
-                else:
-                    dl_str = str(downloads)
-            else:
-                dl_str = "-"
-            
-            # Format dependents - only for Maven (stored in weekly_downloads for Maven)
-            if registry == 'maven' and downloads is not None and downloads > 0:
-                if downloads >= 1_000_000:
-                    dep_str = f"{downloads / 1_000_000:.1f}M"
-                elif downloads >= 1_000:
-                    dep_str = f"{downloads / 1_000:.0f}K"
-                else:
-                    dep_str = str(downloads)
-            else:
-                dep_str = "-"
-            
-            table.add_row(
-                row.get("repo", "?"),
-                row.get("language", "?"),
-                source_str,
-                dl_str,
-                dep_str,
-                f"{row.get('total_risk_score', 0):.1f}",
-                level_styled,
-                f"{row.get('velocity_ratio', 0):.2f}x",
-                gini_str,
-                top1_str,
-                contrib_str,
-                str(row.get("total_commits", "?")),
-            )
+        for row, key in zip(self.filtered_data, keys):
+            if key in self._displayed_keys:
+                continue
+            # Cells are formatted once per row per load; sorting and filtering reuse them
+            cells = self._cell_cache.get(row.rowid)
+            if cells is None:
+                cells = self._cell_cache[row.rowid] = self._format_cells(row)
+            table.add_row(*cells, key=key)
+        
+        if kept and self._displayed_keys:
+            # Move kept and added rows into query order (repo is unique in risk_report)
+            position = {row.repo: index for index, row in enumerate(self.filtered_data)}
+            table.sort("repo", key=position.__getitem__)
+        self._displayed_keys = new_keys
         
         # Update stats
         stats = self.query_one("#stats", Static)
-        total = len(self.all_data)
         showing = len(self.filtered_data)
-        critical = sum(1 for r in self.filtered_data if r.get("risk_level") == "CRITICAL")
-        high = sum(1 for r in self.filtered_data if r.get("risk_level") == "HIGH")
+        critical, high = self._level_counts()
         
         filter_str = f"[cyan]{self.registry_filter.upper()}[/cyan]" if self.registry_filter else "ALL"
         
@@ -328,56 +430,100 @@ class RiskExplorer(App):
             f"Sort: {self.sort_column} ({'desc' if self.sort_reverse else 'asc'})"
         )
     
+    def _format_cells(self, row: RiskRow) -> tuple:
+        """Format one database row into the table's cell strings."""
+        level = row.risk_level
+        level_styled = self._style_level(level)
+        
+        # Handle None values for contributor metrics
+        gini = row.gini_coefficient
+        gini_str = f"{gini:.2f}" if gini is not None else "N/A"
+        top1 = row.top1_share
+        top1_str = f"{top1:.0%}" if top1 is not None else "N/A"
+        contrib = row.contributor_count
+        contrib_str = (str(contrib) if int(contrib) != 100 else ">100") if contrib is not None else "?"
+        
+        # Source (registry)
+        registry = row.registry
+        source_str = registry.upper() if registry else "GH"
+        
+        # Format downloads (weekly) - only for NPM/PyPI
+        downloads = row.weekly_downloads
+        if registry == 'maven':
+            # Maven doesn't have download stats, show dash
+            dl_str = "-"
+        elif downloads is not None and downloads > 0:
+            if downloads >= 1_000_000:
+                dl_str = f"{downloads / 1_000_000:.1f}M"
+            elif downloads >= 1_000:
+                dl_str = f"{downloads / 1_000:.0f}K"
+            else:
+                dl_str = str(downloads)
+        else:
+            dl_str = "-"
+        
+        # Format dependents - only for Maven (stored in weekly_downloads for Maven)
+        if registry == 'maven' and downloads is not None and downloads > 0:
+            if downloads >= 1_000_000:
+                dep_str = f"{downloads / 1_000_000:.1f}M"
+            elif downloads >= 1_000:
+                dep_str = f"{downloads / 1_000:.0f}K"
+            else:
+                dep_str = str(downloads)
+        else:
+            dep_str = "-"
+        
+        return (
+            row.repo,
+            row.language,
+            source_str,
+            dl_str,
+            dep_str,
+            f"{row.total_risk_score:.1f}",
+            level_styled,
+            f"{row.velocity_ratio:.2f}x",
+            gini_str,
+            top1_str,
+            contrib_str,
+            str(row.total_commits),
+        )
+    
     def _style_level(self, level: str) -> str:
         """Apply color styling to risk level."""
-        colors = {
-            "CRITICAL": "[red bold]CRITICAL[/]",
-            "HIGH": "[orange1]HIGH[/]",
-            "MEDIUM": "[yellow]MEDIUM[/]",
-            "LOW": "[green]LOW[/]",
-        }
-        return colors.get(level, level)
+        return LEVEL_STYLES.get(level, level)
     
     def on_input_changed(self, event: Input.Changed) -> None:
-        """Filter table when search input changes."""
-        search = event.value.strip()
+        """Filter table when search input changes, once typing pauses."""
+        # Restart the timer on every keystroke so only the final query runs
+        if self._filter_timer is not None:
+            self._filter_timer.stop()
+        self._filter_timer = self.set_timer(SEARCH_DEBOUNCE, partial(self._apply_filter, event.value))
+    
+    def _apply_filter(self, value: str) -> None:
+        """Apply a search or :command typed into the search box."""
+        self._filter_timer = None
+        search = value.strip()
         
         # Handle command mode (:npm, :pypi, :maven, :all)
         if search.startswith(":"):
             cmd = search[1:].lower()
             if cmd in ("npm", "pypi", "maven"):
                 self.registry_filter = cmd
-                self.filtered_data = [
-                    r for r in self.all_data
-                    if r.get("registry") == cmd
-                ]
+                self.search = ""
                 self.refresh_table()
                 return
             elif cmd == "all":
                 self.registry_filter = None
-                self.filtered_data = self.all_data.copy()
+                self.search = ""
                 self.refresh_table()
                 return
             # Don't filter while typing command
             return
         
-        # Regular search filtering
-        search_lower = search.lower()
-        
-        # Start with all data or registry-filtered data
-        if self.registry_filter:
-            base_data = [r for r in self.all_data if r.get("registry") == self.registry_filter]
-        else:
-            base_data = self.all_data
-        
-        if search_lower:
-            self.filtered_data = [
-                r for r in base_data
-                if search_lower in r.get("repo", "").lower()
-                or search_lower in r.get("risk_level", "").lower()
-            ]
-        else:
-            self.filtered_data = base_data.copy()
+        # Regular search filtering, on top of any registry filter
+        if search == self.search:
+            return
+        self.search = search
         self.refresh_table()
     
     def on_data_table_row_selected(self, event: DataTable.RowSelected) -> None:
@@ -387,23 +533,23 @@ class RiskExplorer(App):
             if 0 <= row_index < len(self.filtered_data):
                 self._show_detail(self.filtered_data[row_index])
     
-    def _show_detail(self, row: dict) -> None:
+    def _show_detail(self, row: RiskRow) -> None:
         """Display detailed info for selected repo."""
         detail = self.query_one("#detail-panel", Static)
         detail.add_class("visible")
         
         # Handle None values for contributor metrics
-        gini = row.get('gini_coefficient')
+        gini = row.gini_coefficient
         gini_str = f"{gini:.3f}" if gini is not None else "N/A"
-        contrib = row.get('contributor_count')
+        contrib = row.contributor_count
         contrib_str = str(contrib) if contrib is not None else "?"
-        top1 = row.get('top1_share')
+        top1 = row.top1_share
         top1_str = f"{top1:.1%}" if top1 is not None else "N/A"
-        top3 = row.get('top3_share')
+        top3 = row.top3_share
         top3_str = f"{top3:.1%}" if top3 is not None else "N/A"
         
         # Format downloads for detail
-        downloads = row.get('weekly_downloads')
+        downloads = row.weekly_downloads
         if downloads is not None and downloads > 0:
             if downloads >= 1_000_000:
                 dl_str = f"{downloads / 1_000_000:.1f}M/wk"
@@ -414,22 +560,22 @@ class RiskExplorer(App):
         else:
             dl_str = "N/A"
         
-        registry = row.get('registry')
-        pkg_name = row.get('package_name')
+        registry = row.registry
+        pkg_name = row.package_name
         source_str = f"{registry.upper()}: {pkg_name}" if registry and pkg_name else "GitHub only"
         
         detail.update(
-            f"[bold cyan]{row.get('repo', '?')}[/] [dim]({source_str})[/]\n"
-            f"Risk Score: {row.get('total_risk_score', 0):.1f} ({row.get('risk_level', '?')}) | "
-            f"Velocity: {row.get('velocity_ratio', 0):.2f}x | "
+            f"[bold cyan]{row.repo}[/] [dim]({source_str})[/]\n"
+            f"Risk Score: {row.total_risk_score:.1f} ({row.risk_level}) | "
+            f"Velocity: {row.velocity_ratio:.2f}x | "
             f"Gini: {gini_str} | "
             f"Downloads: {dl_str}\n"
             f"Contributors: {contrib_str} | "
-            f"Total Commits: {row.get('total_commits', '?')} | "
-            f"Recent Commits: {row.get('recent_commits', '?')}\n"
+            f"Total Commits: {row.total_commits} | "
+            f"Recent Commits: {row.recent_commits}\n"
             f"Top 1 Share: {top1_str} | "
             f"Top 3 Share: {top3_str}\n"
-            f"[dim]Updated: {row.get('updated_at', 'N/A')}[/]"
+            f"[dim]Updated: {row.updated_at}[/]"
         )
     
     def action_focus_search(self) -> None:
@@ -449,31 +595,14 @@ class RiskExplorer(App):
         search_input = self.query_one("#search-input", Input)
         search_input.value = ""
         self.registry_filter = None
-        self.filtered_data = self.all_data.copy()
+        self.search = ""
         self.refresh_table()
         self.query_one("#table", DataTable).focus()
     
     def action_refresh(self) -> None:
         """Reload data from database."""
         self.load_data()
-        search_input = self.query_one("#search-input", Input)
-        
-        # Apply registry filter first
-        if self.registry_filter:
-            base_data = [r for r in self.all_data if r.get("registry") == self.registry_filter]
-        else:
-            base_data = self.all_data
-        
-        # Then apply text search if any
-        if search_input.value and not search_input.value.startswith(":"):
-            search = search_input.value.lower().strip()
-            self.filtered_data = [
-                r for r in base_data
-                if search in r.get("repo", "").lower()
-            ]
-        else:
-            self.filtered_data = base_data.copy()
-        
+        # The registry filter and search are reapplied by the query
         self.refresh_table()
         self.notify("Data refreshed!")
     
@@ -487,7 +616,7 @@ class RiskExplorer(App):
         table = self.query_one("#table", DataTable)
         if table.cursor_row is not None and 0 <= table.cursor_row < len(self.filtered_data):
             row = self.filtered_data[table.cursor_row]
-            repo_name = row.get("repo", "")
+            repo_name = row.repo
             if repo_name:
                 url = f"https://github.com/{repo_name}"
                 webbrowser.open(url)
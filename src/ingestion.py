@@ -1,18 +1,28 @@
 import asyncio
 import httpx
+import json
+import math
 import os
-from typing import List, Dict, Any, Optional
+import sqlite3
+from pathlib import Path
+from typing import AsyncIterator, Callable, List, Dict, Any, Optional, Tuple
 from rich.progress import Progress
 from rich.console import Console
+from src.registry_clients import (
+    DEFAULT_CACHE_DIR, HTTP2_AVAILABLE, _open_etag_cache, _parse_json, _store_etag_entry, _touch_etag_entry
+)
 
 console = Console()
 
+# GitHub search returns at most 1000 results for any query
+SEARCH_RESULT_LIMIT = 1000
+
 class GitHubClient:
     """
     Asynchronous client for fetching GitHub repository statistics.
     Optimized for the /stats/participation endpoint to minimize API usage.
     """
-    def __init__(self, token: str, concurrency: int = 20):
+    def __init__(self, token: str, concurrency: int = 20, cache_dir: Optional[Path] = None):
         self.base_url = "https://api.github.com"
         self.headers = {
             "Authorization": f"token {token}",
@@ -21,15 +31,96 @@ class GitHubClient:
         }
         # Semaphore limits the number of active coroutines
         self.sem = asyncio.Semaphore(concurrency)
+        # Repos in flight at once; twice the request limit so slots freed during
+        # 202 backoff are picked up by other repos
+        self.workers = concurrency * 2
         self.timeout = 30.0
+        # Keep one warm connection per concurrent request; the extra headroom covers
+        # search/rate-limit calls made outside the semaphore
+        self.limits = httpx.Limits(
+            max_keepalive_connections=concurrency,
+            max_connections=concurrency * 2,
+            keepalive_expiry=60.0,
+        )
         self.client: httpx.AsyncClient | None = None
+        # ETag cache for the stats endpoints, opened on first use
+        self.cache_dir = cache_dir or DEFAULT_CACHE_DIR
+        self.etag_cache: sqlite3.Connection | None = None
 
     async def _get_client(self) -> httpx.AsyncClient:
         """Lazily create the client."""
         if self.client is None:
-            self.client = httpx.AsyncClient(headers=self.headers, timeout=self.timeout)
+            self.client = httpx.AsyncClient(
+                headers=self.headers,
+                timeout=self.timeout,
+                limits=self.limits,
+                # Multiplex requests over one connection when h2 (httpx[http2]) is installed
+                http2=HTTP2_AVAILABLE,
+            )
         return self.client
+    
+    async def warmup(self) -> Optional[Dict[str, Any]]:
+        """
+        Prime the connection pool with a cheap authenticated /rate_limit request.
+        Returns the core rate limit info, or None if the request failed.
+        /rate_limit does not count against the rate limit itself.
+        """
+        client = await self._get_client()
+        try:
+            response = await client.get(f"{self.base_url}/rate_limit")
+            if response.status_code == 200:
+                return response.json().get("resources", {}).get("core")
+        except httpx.RequestError:
+            pass
+        return None
 
+    def _get_etag_cache(self) -> sqlite3.Connection:
+        """Lazily open the SQLite cache of conditional-request validators and bodies."""
+        if self.etag_cache is None:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            self.etag_cache = _open_etag_cache(self.cache_dir / "github_etags.db")
+        return self.etag_cache
+    
+    async def _get_stats(self, client: httpx.AsyncClient, url: str, extract: Callable[[Any], Any]) -> Tuple[int, Any]:
+        """
+        GET a stats endpoint as a conditional request.
+        
+        Sends the cached ETag / Last-Modified; a 304 (which doesn't count
+        against the rate limit) is answered from the cache and reported as
+        200. `extract` reduces a fresh JSON body to what the caller keeps,
+        and only that is cached. Returns (status_code, data).
+        
+        If the cache can't be read or written (e.g. a parallel scan holds
+        the lock), the request is simply made unconditionally.
+        """
+        try:
+            cache = self._get_etag_cache()
+            cached = cache.execute("SELECT etag, last_modified, body FROM kv WHERE url = ?", (url,)).fetchone()
+        except sqlite3.Error:
+            cache, cached = None, None
+        headers = {}
+        if cached is not None:
+            etag, last_modified, _ = cached
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
+        
+        response = await client.get(url, headers=headers)
+        if response.status_code == 304 and cached is not None:
+            _touch_etag_entry(cache, url)
+            return 200, json.loads(cached[2])
+        if response.status_code != 200:
+            return response.status_code, None
+        
+        # orjson, when installed, parses large /stats/contributors bodies several times faster
+        data = extract(_parse_json(response.content))
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if cache is not None and (etag or last_modified):
+            _store_etag_entry(cache, url, etag, last_modified, data)
+        return 200, data
+    
     async def fetch_contributor_stats(self, repo_name: str, retries: int = 5) -> Dict[str, Any]:
         """
         Fetches contributor statistics for a repository.
@@ -40,35 +131,37 @@ class GitHubClient:
         client = await self._get_client()
         
         for attempt in range(retries):
+            # Only the request holds a semaphore slot; backoff sleeps happen after
+            # it is released so waiting repos don't block the others
             async with self.sem:
                 try:
-                    response = await client.get(url)
-                    
-                    if response.status_code == 200:
-                        data = response.json()
-                        # Extract total commits per contributor
-                        contributions = [c.get("total", 0) for c in data] if data else []
-                        return {
-                            "repo": repo_name,
-                            "contributions": contributions,
-                            "contributor_count": len(contributions),
-                            "contributor_data_available": True,
-                            "status": "success"
-                        }
-                    elif response.status_code == 202:
-                        # GitHub is computing stats, wait and retry with exponential backoff
-                        if attempt < retries - 1:
-                            await asyncio.sleep(2.0 * (attempt + 1))  # Exponential backoff
-                            continue
-                        return {"repo": repo_name, "status": "pending_calculation", "contributions": [], "contributor_data_available": False}
-                    elif response.status_code == 404:
-                        return {"repo": repo_name, "status": "not_found", "contributions": [], "contributor_data_available": False}
-                    elif response.status_code == 403:
-                        return {"repo": repo_name, "status": "rate_limited", "contributions": [], "contributor_data_available": False}
-                    else:
-                        return {"repo": repo_name, "status": "error", "contributions": [], "contributor_data_available": False}
+                    # Extract total commits per contributor
+                    status, contributions = await self._get_stats(
+                        client, url, lambda data: [c.get("total", 0) for c in data] if data else []
+                    )
                 except httpx.RequestError as e:
                     return {"repo": repo_name, "status": "network_error", "contributions": [], "contributor_data_available": False, "error": str(e)}
+            
+            if status == 200:
+                return {
+                    "repo": repo_name,
+                    "contributions": contributions,
+                    "contributor_count": len(contributions),
+                    "contributor_data_available": True,
+                    "status": "success"
+                }
+            elif status == 202:
+                # GitHub is computing stats, wait and retry with exponential backoff
+                if attempt < retries - 1:
+                    await asyncio.sleep(2.0 * (attempt + 1))  # Exponential backoff
+                    continue
+                return {"repo": repo_name, "status": "pending_calculation", "contributions": [], "contributor_data_available": False}
+            elif status == 404:
+                return {"repo": repo_name, "status": "not_found", "contributions": [], "contributor_data_available": False}
+            elif status == 403:
+                return {"repo": repo_name, "status": "rate_limited", "contributions": [], "contributor_data_available": False}
+            else:
+                return {"repo": repo_name, "status": "error", "contributions": [], "contributor_data_available": False}
         
         return {"repo": repo_name, "status": "pending_calculation", "contributions": [], "contributor_data_available": False}
 
@@ -82,65 +175,122 @@ class GitHubClient:
         client = await self._get_client()
         
         for attempt in range(retries):
+            # Only the request holds a semaphore slot; retry sleeps happen outside it
+            error = None
             async with self.sem:
                 try:
-                    response = await client.get(url)
-                    
-                    if response.status_code == 200:
-                        return {
-                            "repo": repo_name,
-                            "data": response.json(),
-                            "status": "success"
-                        }
-                    elif response.status_code == 202:
-                        # 202 Accepted means GitHub is calculating stats in background.
-                        # Wait with exponential backoff and retry.
-                        if attempt < retries - 1:
-                            await asyncio.sleep(2.0 * (attempt + 1))
-                            continue
-                        return {"repo": repo_name, "status": "pending_calculation"}
-                    elif response.status_code == 404:
-                        return {"repo": repo_name, "status": "not_found"}
-                    elif response.status_code == 403:
-                        return {"repo": repo_name, "status": "rate_limited"}
-                    else:
-                        return {"repo": repo_name, "status": "error", "code": response.status_code}
+                    status, data = await self._get_stats(client, url, lambda data: data)
                 except httpx.RequestError as e:
-                    if attempt < retries - 1:
-                        await asyncio.sleep(1.0)
-                        continue
-                    return {"repo": repo_name, "status": "network_error", "error": str(e)}
+                    error = e
+            
+            if error is not None:
+                if attempt < retries - 1:
+                    await asyncio.sleep(1.0)
+                    continue
+                return {"repo": repo_name, "status": "network_error", "error": str(error)}
+            
+            if status == 200:
+                return {
+                    "repo": repo_name,
+                    "data": data,
+                    "status": "success"
+                }
+            elif status == 202:
+                # 202 Accepted means GitHub is calculating stats in background.
+                # Wait with exponential backoff and retry.
+                if attempt < retries - 1:
+                    await asyncio.sleep(2.0 * (attempt + 1))
+                    continue
+                return {"repo": repo_name, "status": "pending_calculation"}
+            elif status == 404:
+                return {"repo": repo_name, "status": "not_found"}
+            elif status == 403:
+                return {"repo": repo_name, "status": "rate_limited"}
+            else:
+                return {"repo": repo_name, "status": "error", "code": status}
         
         return {"repo": repo_name, "status": "pending_calculation"}
 
+    async def _fetch_repo(self, repo_info: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Fetches participation and contributor stats for one repository concurrently.
+        repo_info: Dict with 'name' and 'language' keys.
+        """
+        repo_name = repo_info["name"]
+        language = repo_info.get("language", "Unknown")
+        participation, contributors = await asyncio.gather(
+            self.fetch_participation_stats(repo_name),
+            self.fetch_contributor_stats(repo_name)
+        )
+        # Merge results
+        result = participation.copy()
+        result["contributions"] = contributors.get("contributions", [])
+        result["contributor_count"] = contributors.get("contributor_count", 0)
+        result["contributor_data_available"] = contributors.get("contributor_data_available", False)
+        result["language"] = language
+        return result
+    
+    async def _fetch_all(self, repo_list: List[Dict[str, Any]]) -> AsyncIterator[Tuple[int, Dict[str, Any]]]:
+        """
+        Fetches every repo with a fixed pool of worker tasks, yielding
+        (index, result) in completion order. Only `self.workers` repo
+        coroutines exist at a time instead of one per repo up front.
+        """
+        todo = iter(enumerate(repo_list))
+        done: asyncio.Queue = asyncio.Queue()
+        
+        async def worker():
+            for index, repo_info in todo:
+                try:
+                    done.put_nowait((index, await self._fetch_repo(repo_info)))
+                except Exception as e:
+                    done.put_nowait((index, e))
+        
+        tasks = [asyncio.create_task(worker()) for _ in range(min(self.workers, len(repo_list)))]
+        try:
+            for _ in range(len(repo_list)):
+                index, result = await done.get()
+                if isinstance(result, Exception):
+                    raise result
+                yield index, result
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+    
     async def fetch_batch(self, repo_list: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
         Orchestrates the concurrent fetching of participation and contributor stats.
-        Merges both results for each repository.
+        Merges both results for each repository, in repo_list order.
         repo_list: List of dicts with 'name' and 'language' keys.
         """
-        async def fetch_both(repo_info: Dict[str, Any]) -> Dict[str, Any]:
-            repo_name = repo_info["name"]
-            language = repo_info.get("language", "Unknown")
-            participation, contributors = await asyncio.gather(
-                self.fetch_participation_stats(repo_name),
-                self.fetch_contributor_stats(repo_name)
-            )
-            # Merge results
-            result = participation.copy()
-            result["contributions"] = contributors.get("contributions", [])
-            result["contributor_count"] = contributors.get("contributor_count", 0)
-            result["contributor_data_available"] = contributors.get("contributor_data_available", False)
-            result["language"] = language
-            return result
-        
-        tasks = [fetch_both(repo) for repo in repo_list]
-        return await asyncio.gather(*tasks)
+        results: List[Dict[str, Any]] = [{}] * len(repo_list)
+        async for index, result in self._fetch_all(repo_list):
+            results[index] = result
+        return results
+    
+    async def fetch_batch_streamed(self, repo_list: List[Dict[str, Any]], chunk: int = 50) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Like fetch_batch, but yields results in chunks of up to `chunk` repos
+        in completion order, so callers can process finished repos while
+        slow or rate-limited ones are still in flight.
+        """
+        batch = []
+        async for _, result in self._fetch_all(repo_list):
+            batch.append(result)
+            if len(batch) >= chunk:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
 
     async def close(self):
         if self.client is not None:
             await self.client.aclose()
             self.client = None
+        if self.etag_cache is not None:
+            self.etag_cache.close()
+            self.etag_cache = None
 
     async def search_repositories(self, query: str = "stars:>1000", per_page: int = 100, max_results: int = 5000) -> List[Dict[str, Any]]:
         """
@@ -148,46 +298,65 @@ class GitHubClient:
         Each dict contains 'name' (owner/repo) and 'language' (primary language).
         Default query returns popular repositories.
         """
+        if max_results <= 0:
+            return []
+        
         url = f"{self.base_url}/search/repositories"
-        repos = []
-        page = 1
         client = await self._get_client()
+        # A fixed page size keeps page offsets aligned; the last page is trimmed instead
+        per_page = min(per_page, max_results)
+        
+        # Page 1 reports total_count, which tells us which other pages exist
+        pages = [await self._fetch_search_page(client, url, query, per_page, 1)]
+        status, data = pages[0]
+        if status == 200:
+            total = min(data.get("total_count", 0), max_results, SEARCH_RESULT_LIMIT)
+            pages += await asyncio.gather(*[
+                self._fetch_search_page(client, url, query, per_page, page)
+                for page in range(2, math.ceil(total / per_page) + 1)
+            ])
         
-        while len(repos) < max_results:
-            params = {
-                "q": query,
-                "sort": "stars",
-                "order": "desc",
-                "per_page": min(per_page, max_results - len(repos)),
-                "page": page
-            }
+        repos = []
+        for status, data in pages:
+            if status == 403:
+                console.print("[red]Rate limit exceeded[/red]")
+                break
+            elif status != 200:
+                break
             
-            try:
-                response = await client.get(url, params=params)
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    items = data.get("items", [])
-                    
-                    if not items:
-                        break
-                    
-                    repos.extend([{
-                        "name": item["full_name"],
-                        "language": item.get("language") or "Unknown"
-                    } for item in items])
-                    
-                    # Check if we've reached the last page
-                    if len(items) < per_page or len(repos) >= max_results:
-                        break
-                    
-                    page += 1
-                elif response.status_code == 403:
-                    console.print("[red]Rate limit exceeded[/red]")
-                    break
-                else:
-                    break
-            except httpx.RequestError:
+            items = data.get("items", [])
+            if not items:
+                break
+            
+            repos.extend([{
+                "name": item["full_name"],
+                "language": item.get("language") or "Unknown"
+            } for item in items])
+            
+            # A short page is the last one
+            if len(items) < per_page:
                 break
         
         return repos[:max_results]
+    
+    async def _fetch_search_page(
+        self, client: httpx.AsyncClient, url: str, query: str, per_page: int, page: int
+    ) -> Tuple[Optional[int], Optional[Dict[str, Any]]]:
+        """
+        Fetches one page of repository search results.
+        Returns (status_code, json), or (None, None) on a network error.
+        """
+        params = {
+            "q": query,
+            "sort": "stars",
+            "order": "desc",
+            "per_page": per_page,
+            "page": page
+        }
+        try:
+            response = await client.get(url, params=params)
+        except httpx.RequestError:
+            return None, None
+        if response.status_code != 200:
+            return response.status_code, None
+        return 200, response.json()
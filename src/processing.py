@@ -2,6 +2,21 @@ import polars as pl
 from typing import List, Dict
 
 
+# Columns built from the raw results, in frame order; registry fields only appear if a result has them
+_RECORD_SCHEMA = {
+    "repo": pl.String,
+    "language": pl.String,
+    "all_commits": pl.List(pl.Int64),
+    "contributor_count": pl.Int64,
+    "contributor_data_available": pl.Boolean,
+    "contributions": pl.List(pl.Int64),
+    "package_name": pl.String,
+    "weekly_downloads": pl.Int64,
+    "registry": pl.String,
+}
+_REGISTRY_FIELDS = ("package_name", "weekly_downloads", "registry")
+
+
 def calculate_gini_coefficient(contributions: List[int]) -> float:
     """
     Calculate the Gini coefficient for contribution distribution.
@@ -51,6 +66,71 @@ def calculate_top_contributor_share(contributions: List[int]) -> Dict[str, float
     return {"top1_share": top1, "top3_share": top3}
 
 
+def _contribution_metrics() -> List[pl.Expr]:
+    """
+    Gini coefficient and top contributor shares over the `contributions` list column.
+    
+    Vectorized equivalents of calculate_gini_coefficient and
+    calculate_top_contributor_share; rows without contributor data
+    (null contributions) stay null.
+    """
+    contributions = pl.col("contributions")
+    n = contributions.list.len()
+    total = contributions.list.sum()
+    # One ascending sort serves both Gini and the top-3 share (its last three elements)
+    ascending = contributions.list.sort()
+    # Σ(i * x_i) over the ascending contributions, i starting at 1
+    weighted = ascending.list.eval(
+        (pl.element() * pl.int_range(1, pl.len() + 1)).sum()
+    ).list.first()
+    
+    return [
+        pl.when((n == 1) | (total == 0)).then(1.0)
+          .otherwise((2 * weighted / (n * total) - (n + 1) / n).clip(0.0, 1.0))
+          .alias("gini_coefficient"),
+        pl.when(total == 0).then(1.0)
+          .otherwise(contributions.list.max() / total)
+          .alias("top1_share"),
+        pl.when(total == 0).then(1.0)
+          .otherwise(ascending.list.tail(3).list.sum() / total)
+          .alias("top3_share"),
+    ]
+
+
+# Risk component scores (scale 0-5), built once and reused by every compute_risk_metrics call
+_RISK_COMPONENTS = [
+    # Velocity risk: lower velocity = higher risk (scale 0-5)
+    pl.when(pl.col("velocity_ratio") < 0.25).then(5.0)
+      .when(pl.col("velocity_ratio") < 0.5).then(4.0)
+      .when(pl.col("velocity_ratio") < 0.75).then(3.0)
+      .when(pl.col("velocity_ratio") < 1.0).then(2.0)
+      .otherwise(1.0)
+      .alias("risk_velocity"),
+    
+    # Bus factor risk based on Gini coefficient (scale 0-5)
+    # Gini > 0.8 = very concentrated, Gini < 0.4 = well distributed
+    # Use neutral score (3.0) if data unavailable
+    pl.when(pl.col("gini_coefficient").is_null()).then(3.0)
+      .when(pl.col("gini_coefficient") > 0.85).then(5.0)
+      .when(pl.col("gini_coefficient") > 0.75).then(4.0)
+      .when(pl.col("gini_coefficient") > 0.6).then(3.0)
+      .when(pl.col("gini_coefficient") > 0.4).then(2.0)
+      .otherwise(1.0)
+      .alias("risk_gini"),
+    
+    # Top contributor concentration risk (scale 0-5)
+    # High risk if top 1 owns >50% OR top 3 own >80%
+    # Use neutral score (3.0) if data unavailable
+    pl.when(pl.col("top1_share").is_null() | pl.col("top3_share").is_null()).then(3.0)
+      .when((pl.col("top1_share") > 0.5) | (pl.col("top3_share") > 0.8)).then(5.0)
+      .when((pl.col("top1_share") > 0.4) | (pl.col("top3_share") > 0.7)).then(4.0)
+      .when((pl.col("top1_share") > 0.3) | (pl.col("top3_share") > 0.6)).then(3.0)
+      .when((pl.col("top1_share") > 0.2) | (pl.col("top3_share") > 0.5)).then(2.0)
+      .otherwise(1.0)
+      .alias("risk_concentration"),
+]
+
+
 def compute_risk_metrics(raw_results: List) -> pl.DataFrame:
     """
     Transforms raw API responses into a structured Risk Scorecard.
@@ -59,8 +139,9 @@ def compute_risk_metrics(raw_results: List) -> pl.DataFrame:
     Supports enriched data from package registries (NPM, PyPI, Maven, etc.)
     with optional fields: package_name, weekly_downloads, registry.
     """
-    # 1. Filter valid data and compute Gini + top contributor shares
-    valid_records = []
+    # 1. Filter valid data into columns; Gini + top contributor shares are computed on the frame
+    columns = {name: [] for name in _RECORD_SCHEMA}
+    registry_fields = set()
     for r in raw_results:
         if r["status"] == "success" and "data" in r:
             contributions = r.get("contributions", [])
@@ -68,41 +149,34 @@ def compute_risk_metrics(raw_results: List) -> pl.DataFrame:
             
             # Only calculate metrics if we have actual contributor data
             if contributor_data_available and contributions:
-                gini = calculate_gini_coefficient(contributions)
-                top_shares = calculate_top_contributor_share(contributions)
                 contributor_count = r.get("contributor_count", len(contributions))
             else:
                 # Use None/sentinel values to indicate missing data
-                gini = None
-                top_shares = {"top1_share": None, "top3_share": None}
+                contributions = None
                 contributor_count = None
             
-            record = {
-                "repo": r["repo"],
-                "language": r.get("language", "Unknown"),
-                "all_commits": r["data"]["all"],
-                "contributor_count": contributor_count,
-                "contributor_data_available": contributor_data_available,
-                "gini_coefficient": gini,
-                "top1_share": top_shares["top1_share"],
-                "top3_share": top_shares["top3_share"],
-            }
+            columns["repo"].append(r["repo"])
+            columns["language"].append(r.get("language", "Unknown"))
+            columns["all_commits"].append(r["data"]["all"])
+            columns["contributor_count"].append(contributor_count)
+            columns["contributor_data_available"].append(contributor_data_available)
+            columns["contributions"].append(contributions)
             
             # Optional package registry fields (NPM, PyPI, Maven, etc.)
-            if "package_name" in r:
-                record["package_name"] = r["package_name"]
-            if "weekly_downloads" in r:
-                record["weekly_downloads"] = r["weekly_downloads"]
-            if "registry" in r:
-                record["registry"] = r["registry"]
-            
-            valid_records.append(record)
+            for field in _REGISTRY_FIELDS:
+                if field in r:
+                    registry_fields.add(field)
+                columns[field].append(r.get(field))
     
-    if not valid_records:
+    if not columns["repo"]:
         return pl.DataFrame()
 
     # 2. Initialize DataFrame
-    df = pl.DataFrame(valid_records)
+    # The schema is explicit so no inference pass runs, and a chunk where no repo
+    # has contributor data still gets a list column
+    df = pl.DataFrame(columns, schema=_RECORD_SCHEMA)
+    df = df.drop([field for field in _REGISTRY_FIELDS if field not in registry_fields])
+    df = df.with_columns(_contribution_metrics()).drop("contributions")
 
     # 3. Feature Engineering
     # Calculate totals and recent activity from the 52-week commit data
@@ -113,6 +187,11 @@ def compute_risk_metrics(raw_results: List) -> pl.DataFrame:
         pl.col("all_commits").list.tail(13).list.sum().alias("recent_commits"),
         # Older activity (first 13 weeks)
         pl.col("all_commits").list.head(13).list.sum().alias("older_commits"),
+        # Valid contributor data (explicit flag or non-null metrics), used by the displays
+        (
+            pl.col("contributor_data_available").fill_null(False)
+            | (pl.col("contributor_count").is_not_null() & pl.col("gini_coefficient").is_not_null())
+        ).alias("has_contributor_data"),
     ])
 
     # 4. Handle "Division by Zero" edge cases (Data Quality)
@@ -128,37 +207,7 @@ def compute_risk_metrics(raw_results: List) -> pl.DataFrame:
     # - If Gini is high (concentrated contributions), Risk goes UP.
     # - If top contributor owns >50%, or top 3 own >80%, Risk goes UP.
     # - If contributor data is unavailable, use neutral score (3.0) instead of extreme values
-    df = df.with_columns([
-        # Velocity risk: lower velocity = higher risk (scale 0-5)
-        pl.when(pl.col("velocity_ratio") < 0.25).then(5.0)
-          .when(pl.col("velocity_ratio") < 0.5).then(4.0)
-          .when(pl.col("velocity_ratio") < 0.75).then(3.0)
-          .when(pl.col("velocity_ratio") < 1.0).then(2.0)
-          .otherwise(1.0)
-          .alias("risk_velocity"),
-        
-        # Bus factor risk based on Gini coefficient (scale 0-5)
-        # Gini > 0.8 = very concentrated, Gini < 0.4 = well distributed
-        # Use neutral score (3.0) if data unavailable
-        pl.when(pl.col("gini_coefficient").is_null()).then(3.0)
-          .when(pl.col("gini_coefficient") > 0.85).then(5.0)
-          .when(pl.col("gini_coefficient") > 0.75).then(4.0)
-          .when(pl.col("gini_coefficient") > 0.6).then(3.0)
-          .when(pl.col("gini_coefficient") > 0.4).then(2.0)
-          .otherwise(1.0)
-          .alias("risk_gini"),
-        
-        # Top contributor concentration risk (scale 0-5)
-        # High risk if top 1 owns >50% OR top 3 own >80%
-        # Use neutral score (3.0) if data unavailable
-        pl.when(pl.col("top1_share").is_null() | pl.col("top3_share").is_null()).then(3.0)
-          .when((pl.col("top1_share") > 0.5) | (pl.col("top3_share") > 0.8)).then(5.0)
-          .when((pl.col("top1_share") > 0.4) | (pl.col("top3_share") > 0.7)).then(4.0)
-          .when((pl.col("top1_share") > 0.3) | (pl.col("top3_share") > 0.6)).then(3.0)
-          .when((pl.col("top1_share") > 0.2) | (pl.col("top3_share") > 0.5)).then(2.0)
-          .otherwise(1.0)
-          .alias("risk_concentration"),
-    ])
+    df = df.with_columns(_RISK_COMPONENTS)
     
     # Combine bus factor risks (average of gini and concentration)
     df = df.with_columns([
@@ -178,5 +227,5 @@ def compute_risk_metrics(raw_results: List) -> pl.DataFrame:
           .alias("risk_level")
     ])
 
-    # Sort by risk (highest first) to surface at-risk projects
-    return df.sort("total_risk_score", descending=True)
+    # Rows are left unsorted; the display picks the riskiest with a top-k
+    return df
@@ -13,21 +13,180 @@ Common functionality:
 """
 
 import asyncio
+import functools
+import gzip
 import httpx
+import importlib.util
+import io
+import itertools
 import json
 import os
 import re
-from datetime import datetime, timedelta
+import sqlite3
+import time
+from collections import deque
 from pathlib import Path
-from typing import List, Dict, Any, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from xml.etree import ElementTree as ET
 from rich.console import Console
 from rich.progress import Progress, TaskID
 
+try:
+    # Optional: faster parsing of cached package lists and registry responses
+    import orjson
+except ImportError:
+    orjson = None
+
 console = Console()
 
 # Cache configuration
 DEFAULT_CACHE_DIR = Path.home() / ".cache" / "risk-tool"
 CACHE_TTL_DAYS = 7  # Weekly cache refresh
+MAX_CACHE_SIZE_MB = 500  # Oldest package caches are evicted past this
+MAX_POM_SIZE_BYTES = 1_000_000  # Larger POMs are skipped rather than downloaded
+POM_RETRY_DELAY = 5  # Seconds before retrying a throttled POM that sent no Retry-After
+# ETag caches are shared by concurrent scans; a locked write is skipped after this
+# long rather than stalling the event loop, since losing an entry only costs a full GET
+ETAG_CACHE_TIMEOUT = 1.0
+# ETag cache entries not sent or refreshed for this long are pruned when the cache is
+# opened. Several refresh cycles, so entries survive until the next weekly refresh uses them
+ETAG_CACHE_MAX_AGE_DAYS = CACHE_TTL_DAYS * 4
+
+# HTTP/2 needs the optional h2 package (httpx[http2]); httpx raises without it
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# Patterns to match GitHub URLs, compiled once for parse_github_url
+GITHUB_HOST_PATTERN = re.compile(r"github\.com[:/]([^/]+)/([^/\s#?.]+)")  # Standard URLs
+OWNER_REPO_PATTERN = re.compile(r"^([^/]+)/([^/\s#?.]+)$")  # Simple owner/repo format
+# PEP 503 name normalization (runs of -, _ and . collapse to -)
+PYPI_NAME_SEPARATORS = re.compile(r"[-_.]+")
+# The parts of a PyPI project's info object that package details are built from
+PYPI_INFO_FIELDS = ("project_urls", "home_page", "version", "summary", "author", "license", "requires_python")
+# POM elements that may point at the GitHub repo, in lookup order
+_POM_SCM_TAGS = ("url", "connection", "developerConnection")
+# Regex fallback for POMs that aren't well-formed XML
+_SCM_SECTION_RE = re.compile(rb"<scm>(.*?)</scm>", re.DOTALL | re.IGNORECASE)
+_SCM_TAG_RE = re.compile(rb"<(url|connection|developerConnection)>([^<]+)</\1>", re.IGNORECASE)
+_PROJECT_URL_RE = re.compile(rb"<url>([^<]*github[^<]+)</url>", re.IGNORECASE)
+_ISSUE_MGMT_RE = re.compile(rb"<issueManagement>.*?<url>([^<]+)</url>.*?</issueManagement>", re.DOTALL | re.IGNORECASE)
+
+
+def _open_etag_cache(path: Path) -> sqlite3.Connection:
+    """
+    Open a conditional-request cache (url -> ETag, Last-Modified, body).
+    
+    Autocommit under WAL keeps each write's lock to its own statement, so
+    parallel scans sharing the file don't wait on each other's open transactions.
+    Entries unused for ETAG_CACHE_MAX_AGE_DAYS are deleted, which bounds the
+    file to the URLs recent scans still ask for.
+    """
+    conn = sqlite3.connect(path, timeout=ETAG_CACHE_TIMEOUT, isolation_level=None)
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(f"PRAGMA busy_timeout={int(ETAG_CACHE_TIMEOUT * 1000)}")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS kv "
+            "(url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, body TEXT, refreshed_at REAL)"
+        )
+        # Caches written before entries were timestamped
+        if "refreshed_at" not in {row[1] for row in conn.execute("PRAGMA table_info(kv)")}:
+            conn.execute("ALTER TABLE kv ADD COLUMN refreshed_at REAL")
+    except sqlite3.Error:
+        conn.close()
+        raise
+    
+    try:
+        cutoff = time.time() - ETAG_CACHE_MAX_AGE_DAYS * 24 * 60 * 60
+        conn.execute("DELETE FROM kv WHERE refreshed_at IS NULL OR refreshed_at < ?", (cutoff,))
+    except sqlite3.Error:
+        pass  # A parallel scan holds the lock; the next open prunes instead
+    return conn
+
+
+def _store_etag_entry(
+    cache: sqlite3.Connection, url: str, etag: Optional[str], last_modified: Optional[str], data: Any
+):
+    """Save a fresh response's validators and kept body, timestamped now."""
+    try:
+        cache.execute(
+            "INSERT OR REPLACE INTO kv (url, etag, last_modified, body, refreshed_at) VALUES (?, ?, ?, ?, ?)",
+            (url, etag, last_modified, json.dumps(data), time.time()),
+        )
+    except sqlite3.Error:
+        pass  # Losing the entry only costs a full download next time
+
+
+def _touch_etag_entry(cache: sqlite3.Connection, url: str):
+    """Mark an entry a 304 just confirmed as current, so pruning keeps it."""
+    try:
+        cache.execute("UPDATE kv SET refreshed_at = ? WHERE url = ?", (time.time(), url))
+    except sqlite3.Error:
+        pass  # It is only pruned sooner
+
+
+def _parse_json(content: bytes) -> Any:
+    """Parse a JSON document, with orjson when it is installed."""
+    return orjson.loads(content) if orjson is not None else json.loads(content)
+
+
+class RateLimiter:
+    """
+    Sliding-window rate limiter: at most `max_calls` acquisitions per
+    `period` seconds. Callers only wait once the window is full.
+    """
+    
+    def __init__(self, max_calls: int, period: float):
+        self.max_calls = max_calls
+        self.period = period
+        self.calls: deque = deque()  # Monotonic timestamps of recent acquisitions
+    
+    async def acquire(self):
+        """Wait until another call fits in the window, then record it."""
+        while True:
+            now = time.monotonic()
+            while self.calls and now - self.calls[0] >= self.period:
+                self.calls.popleft()
+            
+            if len(self.calls) < self.max_calls:
+                self.calls.append(now)
+                return
+            
+            await asyncio.sleep(self.period - (now - self.calls[0]))
+
+
+class ConcurrencyLimiter:
+    """
+    Caps requests in flight, like asyncio.Semaphore, but the cap halves
+    on each 429 or 503 and climbs back by one per successful response.
+    """
+    
+    def __init__(self, limit: int):
+        self.max_limit = limit
+        self.limit = limit
+        self.in_flight = 0
+        self._cond = asyncio.Condition()
+    
+    async def __aenter__(self):
+        async with self._cond:
+            await self._cond.wait_for(lambda: self.in_flight < self.limit)
+            self.in_flight += 1
+    
+    async def __aexit__(self, *exc_info):
+        async with self._cond:
+            self.in_flight -= 1
+            # Wake one waiter per free slot, which covers slots added by record()
+            self._cond.notify(max(self.limit - self.in_flight, 0))
+    
+    def locked(self) -> bool:
+        """Whether a new request would have to wait."""
+        return self.in_flight >= self.limit
+    
+    def record(self, status_code: int):
+        """Adjust the cap from a response status."""
+        if status_code in (429, 503):
+            self.limit = max(1, self.limit // 2)
+        elif status_code < 400 and self.limit < self.max_limit:
+            self.limit += 1
 
 
 class PackageRegistryClient:
@@ -36,65 +195,229 @@ class PackageRegistryClient:
     Provides common functionality for caching and GitHub repo extraction.
     """
     
+    # Package field that min_downloads is compared against
+    POPULARITY_KEY = "weekly_downloads"
+    
     def __init__(self, concurrency: int = 10, cache_dir: Optional[Path] = None):
-        self.sem = asyncio.Semaphore(concurrency)
-        self.timeout = 30.0
+        self.concurrency = concurrency
+        # Shrinks while a registry answers 429 and recovers as requests succeed
+        self.sem = ConcurrencyLimiter(concurrency)
+        # Fail fast on unreachable hosts, but give large registry documents time to download
+        self.timeout = httpx.Timeout(30.0, connect=5.0)
+        # Pool sized to the semaphore: a warm connection per concurrent request,
+        # with headroom for the unthrottled search and dataset downloads
+        self.limits = httpx.Limits(
+            max_keepalive_connections=concurrency,
+            max_connections=max(concurrency * 2, 20),
+            keepalive_expiry=30.0,
+        )
         self.client: Optional[httpx.AsyncClient] = None
+        # Metadata lookups in flight, so concurrent callers share one request per name
+        self._inflight: Dict[str, asyncio.Future] = {}
         self.cache_dir = cache_dir or DEFAULT_CACHE_DIR
         self.cache_dir.mkdir(parents=True, exist_ok=True)
+        # ETag cache for per-package metadata requests, opened on first use
+        self.etag_cache: Optional[sqlite3.Connection] = None
     
     async def _get_client(self) -> httpx.AsyncClient:
         """Lazily create the HTTP client."""
         if self.client is None:
-            self.client = httpx.AsyncClient(timeout=self.timeout)
+            # Concurrent lookups against one registry host multiplex over a single connection.
+            # The client's own limits/http2 are ignored once a transport is given, so they go here;
+            # the transport retries failed connects only, never a request that reached the server
+            transport = httpx.AsyncHTTPTransport(retries=2, limits=self.limits, http2=HTTP2_AVAILABLE)
+            self.client = httpx.AsyncClient(timeout=self.timeout, transport=transport)
         return self.client
     
     async def close(self):
-        """Close the HTTP client."""
+        """Close the HTTP client and the ETag cache."""
         if self.client is not None:
             await self.client.aclose()
             self.client = None
+        if self.etag_cache is not None:
+            self.etag_cache.close()
+            self.etag_cache = None
+    
+    def _get_etag_cache(self) -> sqlite3.Connection:
+        """Lazily open the SQLite cache of conditional-request validators and bodies."""
+        if self.etag_cache is None:
+            self.etag_cache = _open_etag_cache(self.cache_dir / "registry_etags.db")
+        return self.etag_cache
+    
+    async def _get_json(
+        self,
+        client: httpx.AsyncClient,
+        url: str,
+        extract: Callable[[Any], Any] = lambda data: data
+    ) -> Tuple[int, Any]:
+        """
+        GET a registry JSON document as a conditional request.
+        
+        Sends the cached ETag / Last-Modified, and answers a 304 from the
+        cache as a 200. `extract` reduces a fresh body to what the caller
+        keeps, and only that is cached. Returns (status_code, data).
+        
+        If the cache can't be read or written (e.g. another scan holds the
+        lock), the request is simply made unconditionally.
+        """
+        try:
+            cache = self._get_etag_cache()
+            cached = cache.execute("SELECT etag, last_modified, body FROM kv WHERE url = ?", (url,)).fetchone()
+        except sqlite3.Error:
+            cache, cached = None, None
+        headers = {}
+        if cached is not None:
+            etag, last_modified, _ = cached
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
+        
+        response = await client.get(url, headers=headers)
+        self.sem.record(response.status_code)
+        if response.status_code == 304 and cached is not None:
+            _touch_etag_entry(cache, url)
+            return 200, _parse_json(cached[2])
+        if response.status_code != 200:
+            return response.status_code, None
+        
+        data = extract(_parse_json(response.content))
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if cache is not None and (etag or last_modified):
+            _store_etag_entry(cache, url, etag, last_modified, data)
+        return 200, data
     
     def _get_cache_path(self, cache_key: str) -> Path:
-        """Get the cache file path for a given key."""
-        return self.cache_dir / f"{cache_key}.json"
+        """Get the cache file path for a given key (gzip-compressed JSON)."""
+        return self.cache_dir / f"{cache_key}.json.gz"
     
     def _is_cache_valid(self, cache_path: Path) -> bool:
         """Check if cache exists and is within TTL."""
-        if not cache_path.exists():
+        try:
+            mtime = cache_path.stat().st_mtime
+        except FileNotFoundError:
             return False
         
-        mtime = datetime.fromtimestamp(cache_path.stat().st_mtime)
-        return datetime.now() - mtime < timedelta(days=CACHE_TTL_DAYS)
+        # Plain epoch seconds on both sides, so local time and DST don't shift the boundary
+        return time.time() - mtime < CACHE_TTL_DAYS * 86400
     
     def _load_cache(self, cache_key: str) -> Optional[List[Dict[str, Any]]]:
         """Load data from cache if valid."""
         cache_path = self._get_cache_path(cache_key)
         if self._is_cache_valid(cache_path):
             try:
-                with open(cache_path, "r") as f:
-                    data = json.load(f)
-                    console.print(f"[dim]Loaded {len(data)} packages from cache ({cache_path})[/dim]")
-                    return data
-            except (json.JSONDecodeError, IOError):
+                data = _parse_json(gzip.decompress(cache_path.read_bytes()))
+                console.print(f"[dim]Loaded {len(data)} packages from cache ({cache_path})[/dim]")
+                return data
+            except (json.JSONDecodeError, EOFError, IOError):
                 pass
         return None
     
+    def _load_stale_cache(self, cache_key: str) -> Dict[str, Dict[str, Any]]:
+        """
+        Load packages from a cache regardless of TTL, keyed by package name.
+        
+        Used on refresh so packages whose version hasn't changed keep their
+        resolved GitHub repo instead of being looked up again.
+        """
+        cache_path = self._get_cache_path(cache_key)
+        if not cache_path.exists():
+            return {}
+        
+        try:
+            data = _parse_json(gzip.decompress(cache_path.read_bytes()))
+        except (json.JSONDecodeError, EOFError, IOError):
+            return {}
+        
+        return {pkg.get("name"): pkg for pkg in data}
+    
+    @staticmethod
+    def _reuse_github_repo(pkg: Dict[str, Any], previous: Dict[str, Dict[str, Any]]) -> bool:
+        """
+        Copy the GitHub repo resolved on a previous fetch if the package's
+        version is unchanged. Returns True when the lookup can be skipped.
+        """
+        cached = previous.get(pkg.get("name"))
+        if not cached or not cached.get("github_repo") or cached.get("version") != pkg.get("version"):
+            return False
+        
+        pkg["github_repo"] = cached["github_repo"]
+        return True
+    
     def _save_cache(self, cache_key: str, data: List[Dict[str, Any]]):
         """Save data to cache."""
         cache_path = self._get_cache_path(cache_key)
+        payload = orjson.dumps(data) if orjson is not None else json.dumps(data).encode()
+        # Level 1 already shrinks the JSON several times over and keeps saves fast
+        payload = gzip.compress(payload, compresslevel=1)
         try:
-            with open(cache_path, "w") as f:
-                json.dump(data, f)
+            self._evict_cache(len(payload), cache_path)
+            cache_path.write_bytes(payload)
             console.print(f"[dim]Cached {len(data)} packages to {cache_path}[/dim]")
         except IOError as e:
             console.print(f"[yellow]Warning: Could not save cache: {e}[/yellow]")
     
+    def _evict_cache(self, incoming: int, replacing: Path):
+        """
+        Delete the least recently written package caches until `incoming`
+        more bytes fit under MAX_CACHE_SIZE_MB. `replacing` is about to be
+        overwritten, so it doesn't count.
+        """
+        cached = sorted(
+            (p.stat().st_mtime, p.stat().st_size, p)
+            for p in self.cache_dir.glob("*.json*")  # Includes uncompressed caches from older versions
+            if p != replacing
+        )
+        total = incoming + sum(size for _, size, _ in cached)
+        limit = MAX_CACHE_SIZE_MB * 1024 * 1024
+        
+        for _, size, path in cached:
+            if total <= limit:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+    
+    def filter_github_packages(
+        self, 
+        packages: List[Dict[str, Any]],
+        min_downloads: int = 0
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Filter packages to only those with GitHub repos and an optional minimum
+        popularity (POPULARITY_KEY: weekly downloads, or dependents for Maven).
+        
+        Returns:
+            Tuple of (filtered packages, count of skipped packages)
+        """
+        filtered = [
+            pkg for pkg in packages
+            if pkg.get("github_repo") and pkg.get(self.POPULARITY_KEY, 0) >= min_downloads
+        ]
+        return filtered, len(packages) - len(filtered)
+    
     @staticmethod
+    def _packages_by_repo(packages: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """
+        Map each GitHub repo to the first package that points at it, in order.
+        Multiple packages can share a repo; packages without one are skipped.
+        """
+        by_repo = {}
+        for pkg in packages:
+            github_repo = pkg.get("github_repo")
+            if github_repo:
+                by_repo.setdefault(github_repo, pkg)
+        return by_repo
+    
+    @staticmethod
+    @functools.lru_cache(maxsize=4096)
     def parse_github_url(repo_url: str) -> Optional[str]:
         """
         Extract owner/repo from various GitHub URL formats.
         
+        Results are memoized: POMs inheriting from the same parent, and
+        packages from one monorepo, keep asking about the same URLs.
+        
         Handles:
         - https://github.com/owner/repo
         - git+https://github.com/owner/repo.git
@@ -112,21 +435,26 @@ class PackageRegistryClient:
         if url.startswith("github:"):
             url = url[7:]
             if "/" in url:
-                return url.split("/")[0] + "/" + url.split("/")[1].replace(".git", "")
+                return url.split("/")[0] + "/" + url.split("/")[1].removesuffix(".git")
         
-        # Pattern to match GitHub URLs
-        patterns = [
-            r"github\.com[:/]([^/]+)/([^/\s#?.]+)",  # Standard URLs
-            r"^([^/]+)/([^/\s#?.]+)$",  # Simple owner/repo format
-        ]
+        # Both patterns need an owner/repo separator
+        if "/" not in url:
+            return None
         
-        for pattern in patterns:
-            match = re.search(pattern, url)
-            if match:
-                owner, repo = match.groups()
-                # Clean up .git suffix
-                repo = repo.replace(".git", "")
-                return f"{owner}/{repo}"
+        # Only URLs mentioning github.com can match the host pattern
+        match = GITHUB_HOST_PATTERN.search(url) if "github.com" in url else None
+        if match is None:
+            # The bare owner/repo form has exactly one slash; docs, tracker and
+            # other non-GitHub URLs almost always have more
+            if url.count("/") != 1:
+                return None
+            match = OWNER_REPO_PATTERN.search(url)
+        
+        if match:
+            owner, repo = match.groups()
+            # Clean up .git suffix
+            repo = repo.removesuffix(".git")
+            return f"{owner}/{repo}"
         
         return None
 
@@ -173,9 +501,6 @@ class NPMClient(PackageRegistryClient):
         
         console.print(f"[bold blue]Fetching top {max_results} NPM packages...[/bold blue]")
         
-        packages = []
-        seen_packages = set()  # Dedupe across search terms
-        
         # NPM API requires text parameter - search multiple broad terms to get diverse packages
         # These are common keywords/patterns in JavaScript packages
         search_terms = [
@@ -192,74 +517,44 @@ class NPMClient(PackageRegistryClient):
         client = await self._get_client()
         packages_per_term = max(250, max_results // len(search_terms) + 100)  # Over-fetch to account for dedupes
         
+        first_size = min(self.page_size, packages_per_term)
+        
         with Progress() as progress:
-            task = progress.add_task("[cyan]Searching NPM registry...", total=max_results)
+            task = progress.add_task("[cyan]Searching NPM registry...", total=first_size * len(search_terms))
             
-            for search_term in search_terms:
-                if len(packages) >= max_results:
-                    break
-                    
-                from_offset = 0
-                term_packages = 0
-                
-                while term_packages < packages_per_term and len(packages) < max_results:
-                    params = {
-                        "text": search_term,
-                        "size": min(self.page_size, packages_per_term - term_packages),
-                        "from": from_offset,
-                        "popularity": 1.0,  # Sort by popularity
-                        "quality": 0.0,
-                        "maintenance": 0.0,
-                    }
-                    
-                    async with self.sem:
-                        try:
-                            response = await client.get(self.SEARCH_URL, params=params)
-                            
-                            if response.status_code == 200:
-                                data = response.json()
-                                objects = data.get("objects", [])
-                                
-                                if not objects:
-                                    break
-                                
-                                for obj in objects:
-                                    pkg = obj.get("package", {})
-                                    pkg_name = pkg.get("name")
-                                    
-                                    # Skip if already seen
-                                    if pkg_name in seen_packages:
-                                        continue
-                                    seen_packages.add(pkg_name)
-                                    
-                                    # Get downloads from response (new NPM API includes it)
-                                    downloads_info = obj.get("downloads", {})
-                                    weekly_downloads = downloads_info.get("weekly", 0)
-                                    
-                                    packages.append({
-                                        "name": pkg_name,
-                                        "version": pkg.get("version"),
-                                        "description": pkg.get("description", ""),
-                                        "keywords": pkg.get("keywords", []),
-                                        "repository": pkg.get("links", {}).get("repository"),
-                                        "npm_url": pkg.get("links", {}).get("npm"),
-                                        "score": obj.get("score", {}).get("final", 0),
-                                        "popularity_score": obj.get("score", {}).get("detail", {}).get("popularity", 0),
-                                        "weekly_downloads": weekly_downloads,
-                                    })
-                                    term_packages += 1
-                                
-                                progress.update(task, completed=min(len(packages), max_results))
-                                from_offset += self.page_size
-                                
-                                # Rate limiting: small delay between requests
-                                await asyncio.sleep(0.1)
-                            else:
-                                console.print(f"[yellow]NPM API returned {response.status_code} for '{search_term}'[/yellow]")
-                                break
-                        except httpx.RequestError as e:
-                            console.print(f"[red]NPM API error: {e}[/red]")
-                            break
+            # The first page of every term is requested at once; its total says how
+            # many more pages the term actually has
+            first_pages = await asyncio.gather(*(
+                self._search_page(client, search_term, 0, first_size, progress, task)
+                for search_term in search_terms
+            ))
+            
+            # The remaining pages of every term are then requested concurrently too
+            pages = []
+            for i, (total, _) in enumerate(first_pages):
+                limit = min(packages_per_term, total)
+                pages.extend(
+                    (i, from_offset, min(self.page_size, limit - from_offset))
+                    for from_offset in range(first_size, limit, self.page_size)
+                )
+            progress.update(task, total=first_size * len(search_terms) + sum(size for _, _, size in pages))
+            
+            rest_pages = await asyncio.gather(*(
+                self._search_page(client, search_terms[i], from_offset, size, progress, task)
+                for i, from_offset, size in pages
+            ))
+        
+        term_results = [[term_packages] for _, term_packages in first_pages]
+        for (i, _, _), (_, page_packages) in zip(pages, rest_pages):
+            term_results[i].append(page_packages)
+        
+        packages = []
+        seen_packages = set()  # Dedupe across search terms, earlier terms and pages first
+        for term_pages in term_results:
+            for pkg in itertools.chain.from_iterable(term_pages):
+                if pkg["name"] not in seen_packages:
+                    seen_packages.add(pkg["name"])
+                    packages.append(pkg)
         
         # Sort by popularity (weekly downloads) and trim to max_results
         packages.sort(key=lambda x: x.get("weekly_downloads", 0), reverse=True)
@@ -267,8 +562,9 @@ class NPMClient(PackageRegistryClient):
         
         console.print(f"[green]Found {len(packages)} unique packages[/green]")
         
-        # Resolve GitHub repos from package metadata
-        packages = await self._resolve_github_repos(packages)
+        # Resolve GitHub repos from package metadata, reusing unchanged packages from an expired cache
+        previous = self._load_stale_cache(cache_key) if use_cache else {}
+        packages = await self._resolve_github_repos(packages, previous)
         
         # Save to cache
         if use_cache:
@@ -276,19 +572,86 @@ class NPMClient(PackageRegistryClient):
         
         return packages
     
-    async def _resolve_github_repos(self, packages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    async def _search_page(
+        self,
+        client: httpx.AsyncClient,
+        search_term: str,
+        from_offset: int,
+        size: int,
+        progress: Progress,
+        task: TaskID
+    ) -> Tuple[int, List[Dict[str, Any]]]:
         """
-        Resolve GitHub repository URLs from package metadata.
-        Fetches full package info for packages without repository links.
+        Fetch one page of search results for a term, most popular first.
+        
+        Returns (total matches for the term, packages on this page), or
+        (0, []) if the request fails. Packages are not deduplicated against
+        other pages here.
         """
-        client = await self._get_client()
+        params = {
+            "text": search_term,
+            "size": size,
+            "from": from_offset,
+            "popularity": 1.0,  # Sort by popularity
+            "quality": 0.0,
+            "maintenance": 0.0,
+        }
+        
+        async with self.sem:
+            try:
+                response = await client.get(self.SEARCH_URL, params=params)
+            except httpx.RequestError as e:
+                console.print(f"[red]NPM API error: {e}[/red]")
+                return 0, []
         
+        progress.update(task, advance=size)
+        
+        if response.status_code != 200:
+            console.print(f"[yellow]NPM API returned {response.status_code} for '{search_term}'[/yellow]")
+            return 0, []
+        
+        data = _parse_json(response.content)
+        packages = []
+        for obj in data.get("objects", []):
+            pkg = obj.get("package", {})
+            
+            # Get downloads from response (new NPM API includes it)
+            downloads_info = obj.get("downloads", {})
+            weekly_downloads = downloads_info.get("weekly", 0)
+            
+            packages.append({
+                "name": pkg.get("name"),
+                "version": pkg.get("version"),
+                "description": pkg.get("description", ""),
+                "keywords": pkg.get("keywords", []),
+                "repository": pkg.get("links", {}).get("repository"),
+                "npm_url": pkg.get("links", {}).get("npm"),
+                "score": obj.get("score", {}).get("final", 0),
+                "popularity_score": obj.get("score", {}).get("detail", {}).get("popularity", 0),
+                "weekly_downloads": weekly_downloads,
+            })
+        
+        return data.get("total", 0), packages
+    
+    async def _resolve_github_repos(
+        self, 
+        packages: List[Dict[str, Any]],
+        previous: Optional[Dict[str, Dict[str, Any]]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Resolve GitHub repository URLs from package metadata.
+        Fetches full package info for packages without repository links,
+        unless `previous` already resolved the same version.
+        """
+        previous = previous or {}
         packages_needing_lookup = []
         for i, pkg in enumerate(packages):
             repo_url = pkg.get("repository")
             if repo_url:
                 github_repo = self.parse_github_url(repo_url)
                 packages[i]["github_repo"] = github_repo
+            elif self._reuse_github_repo(pkg, previous):
+                continue
             else:
                 packages_needing_lookup.append(i)
         
@@ -300,63 +663,70 @@ class NPMClient(PackageRegistryClient):
                     total=len(packages_needing_lookup)
                 )
                 
-                for idx in packages_needing_lookup:
-                    pkg_name = packages[idx].get("name")
-                    if not pkg_name:
-                        continue
-                    
-                    async with self.sem:
-                        try:
-                            url = f"{self.REGISTRY_URL}/{pkg_name}"
-                            response = await client.get(url)
-                            
-                            if response.status_code == 200:
-                                data = response.json()
-                                repo = data.get("repository", {})
-                                
-                                if isinstance(repo, dict):
-                                    repo_url = repo.get("url", "")
-                                elif isinstance(repo, str):
-                                    repo_url = repo
-                                else:
-                                    repo_url = ""
-                                
-                                packages[idx]["github_repo"] = self.parse_github_url(repo_url)
-                            
-                            progress.update(task, advance=1)
-                            await asyncio.sleep(0.02)
-                            
-                        except httpx.RequestError:
-                            pass
+                # Lookups run concurrently, bounded by the semaphore in _fetch_package
+                await asyncio.gather(*(
+                    self._lookup_github_repo(packages[idx], progress, task)
+                    for idx in packages_needing_lookup
+                ))
         
         return packages
     
-    def filter_github_packages(
-        self, 
-        packages: List[Dict[str, Any]],
-        min_downloads: int = 0
-    ) -> Tuple[List[Dict[str, Any]], int]:
+    async def _lookup_github_repo(self, pkg: Dict[str, Any], progress: Progress, task: TaskID):
+        """Set a package's github_repo from the repository field of its registry metadata."""
+        pkg_name = pkg.get("name")
+        if not pkg_name:
+            return
+        
+        try:
+            data = await self._get_package(pkg_name)
+            
+            if data is not None:
+                repo = data.get("repository", {})
+                
+                if isinstance(repo, dict):
+                    repo_url = repo.get("url", "")
+                elif isinstance(repo, str):
+                    repo_url = repo
+                else:
+                    repo_url = ""
+                
+                pkg["github_repo"] = self.parse_github_url(repo_url)
+            
+            progress.update(task, advance=1)
+            
+        except httpx.RequestError:
+            pass
+    
+    async def _get_package(self, name: str) -> Optional[Dict[str, Any]]:
         """
-        Filter packages to only those with GitHub repos and optional minimum downloads.
+        Fetch a package's registry metadata, or None if it isn't found.
         
-        Returns:
-            Tuple of (filtered packages, count of skipped packages)
+        Callers asking for a name that is already being fetched await the
+        same request instead of issuing another one.
+        """
+        task = self._inflight.get(name)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch_package(name))
+            self._inflight[name] = task
+            task.add_done_callback(lambda _: self._inflight.pop(name, None))
+        # Shielded so a cancelled caller only abandons its own wait, not the shared fetch
+        return await asyncio.shield(task)
+    
+    async def _fetch_package(self, name: str) -> Optional[Dict[str, Any]]:
         """
-        filtered = []
-        skipped = 0
+        Fetch the latest version's manifest for a single package.
         
-        for pkg in packages:
-            if not pkg.get("github_repo"):
-                skipped += 1
-                continue
-            
-            if pkg.get("weekly_downloads", 0) < min_downloads:
-                skipped += 1
-                continue
-            
-            filtered.append(pkg)
+        The /latest document carries the same repository field as the full
+        packument, without the metadata for every published version.
+        """
+        client = await self._get_client()
+        async with self.sem:
+            # Only the repository field is used, so only it is cached
+            status, data = await self._get_json(
+                client, f"{self.REGISTRY_URL}/{name}/latest", lambda data: {"repository": data.get("repository")}
+            )
         
-        return filtered, skipped
+        return data if status == 200 else None
     
     def to_repo_list(self, packages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
@@ -369,24 +739,16 @@ class NPMClient(PackageRegistryClient):
         - weekly_downloads: download count
         - registry: "npm"
         """
-        repo_list = []
-        seen_repos = set()  # Deduplicate repos (multiple packages can share a repo)
-        
-        for pkg in packages:
-            github_repo = pkg.get("github_repo")
-            if not github_repo or github_repo in seen_repos:
-                continue
-            
-            seen_repos.add(github_repo)
-            repo_list.append({
+        return [
+            {
                 "name": github_repo,
                 "language": "JavaScript",  # Default for NPM packages
                 "package_name": pkg.get("name"),
                 "weekly_downloads": pkg.get("weekly_downloads", 0),
                 "registry": "npm",
-            })
-        
-        return repo_list
+            }
+            for github_repo, pkg in self._packages_by_repo(packages).items()
+        ]
 
 
 class PyPIClient(PackageRegistryClient):
@@ -440,7 +802,7 @@ class PyPIClient(PackageRegistryClient):
                 console.print(f"[red]Failed to fetch top packages list: HTTP {response.status_code}[/red]")
                 return []
             
-            data = response.json()
+            data = _parse_json(response.content)
             rows = data.get("rows", [])[:max_results]
             
         except httpx.RequestError as e:
@@ -450,30 +812,22 @@ class PyPIClient(PackageRegistryClient):
         console.print(f"[dim]Found {len(rows)} packages in top packages list[/dim]")
         
         # 2. Fetch detailed info for each package (including repo URL)
-        packages = []
-        
         with Progress() as progress:
             task = progress.add_task("[cyan]Fetching PyPI package details...", total=len(rows))
             
-            # Process in batches to respect rate limits
-            batch_size = 50
-            for i in range(0, len(rows), batch_size):
-                batch = rows[i:i + batch_size]
-                tasks = [
-                    self._fetch_package_details(client, pkg["project"], pkg["download_count"])
-                    for pkg in batch
-                ]
-                
-                results = await asyncio.gather(*tasks, return_exceptions=True)
-                
-                for result in results:
-                    if isinstance(result, dict):
-                        packages.append(result)
-                    progress.update(task, advance=1)
-                
-                # Small delay between batches to be nice to PyPI
-                if i + batch_size < len(rows):
-                    await asyncio.sleep(0.5)
+            # All lookups are queued at once; the semaphore keeps `concurrency` in flight,
+            # so one slow response no longer holds back a whole batch
+            tasks = [
+                asyncio.ensure_future(self._fetch_package_details(client, pkg["project"], pkg["download_count"]))
+                for pkg in rows
+            ]
+            for fetch in tasks:
+                fetch.add_done_callback(lambda _: progress.update(task, advance=1))
+            
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+        
+        # Keep the dataset's download ranking
+        packages = [result for result in results if isinstance(result, dict)]
         
         console.print(f"[green]Fetched details for {len(packages)} packages[/green]")
         
@@ -483,6 +837,12 @@ class PyPIClient(PackageRegistryClient):
         
         return packages
     
+    @staticmethod
+    def _extract_info(data: Dict[str, Any]) -> Dict[str, Any]:
+        """Reduce a PyPI JSON document to the info fields _fetch_package_details reads."""
+        info = data.get("info") or {}
+        return {key: info.get(key) for key in PYPI_INFO_FIELDS}
+    
     async def _fetch_package_details(
         self, 
         client: httpx.AsyncClient, 
@@ -494,39 +854,34 @@ class PyPIClient(PackageRegistryClient):
         """
         async with self.sem:
             try:
-                url = f"{self.PYPI_API_URL}/{package_name}/json"
-                response = await client.get(url)
+                # PyPI redirects non-normalized names, and the client doesn't follow redirects
+                normalized = PYPI_NAME_SEPARATORS.sub("-", package_name).lower()
+                url = f"{self.PYPI_API_URL}/{normalized}/json"
+                # Only the info fields read below are kept (and cached); the README, classifiers
+                # and per-release file listings are dropped as soon as the document is parsed
+                status, info = await self._get_json(client, url, self._extract_info)
                 
-                if response.status_code != 200:
+                if status != 200:
                     return None
                 
-                data = response.json()
-                info = data.get("info", {})
-                
                 # Extract project URLs
                 project_urls = info.get("project_urls") or {}
                 home_page = info.get("home_page", "")
                 
-                # Try to find GitHub repo from various sources
-                github_repo = None
-                
-                # Check project_urls for common keys
-                for key in ["Source", "Source Code", "Repository", "GitHub", "Homepage", "Code"]:
-                    if key in project_urls:
-                        github_repo = self.parse_github_url(project_urls[key])
-                        if github_repo:
-                            break
-                
-                # Fallback to home_page
-                if not github_repo and home_page:
-                    github_repo = self.parse_github_url(home_page)
+                # Try to find GitHub repo from various sources, in priority order:
+                # common project_urls keys, then home_page, then every other project_urls value
+                candidates = [
+                    project_urls.get(key)
+                    for key in ["Source", "Source Code", "Repository", "GitHub", "Homepage", "Code"]
+                ]
+                candidates.append(home_page)
+                candidates.extend(project_urls.values())
                 
-                # Check all project_urls values as last resort
-                if not github_repo:
-                    for url in project_urls.values():
-                        github_repo = self.parse_github_url(url)
-                        if github_repo:
-                            break
+                # dict.fromkeys keeps that order while parsing each distinct URL only once
+                github_repo = next(
+                    (repo for repo in map(self.parse_github_url, dict.fromkeys(filter(None, candidates))) if repo),
+                    None
+                )
                 
                 return {
                     "name": package_name,
@@ -543,33 +898,6 @@ class PyPIClient(PackageRegistryClient):
             except (httpx.RequestError, json.JSONDecodeError):
                 return None
     
-    def filter_github_packages(
-        self, 
-        packages: List[Dict[str, Any]],
-        min_downloads: int = 0
-    ) -> Tuple[List[Dict[str, Any]], int]:
-        """
-        Filter packages to only those with GitHub repos and optional minimum downloads.
-        
-        Returns:
-            Tuple of (filtered packages, count of skipped packages)
-        """
-        filtered = []
-        skipped = 0
-        
-        for pkg in packages:
-            if not pkg.get("github_repo"):
-                skipped += 1
-                continue
-            
-            if pkg.get("weekly_downloads", 0) < min_downloads:
-                skipped += 1
-                continue
-            
-            filtered.append(pkg)
-        
-        return filtered, skipped
-    
     def to_repo_list(self, packages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
         Convert PyPI packages to the format expected by GitHubClient.fetch_batch().
@@ -581,24 +909,16 @@ class PyPIClient(PackageRegistryClient):
         - weekly_downloads: download count
         - registry: "pypi"
         """
-        repo_list = []
-        seen_repos = set()  # Deduplicate repos (multiple packages can share a repo)
-        
-        for pkg in packages:
-            github_repo = pkg.get("github_repo")
-            if not github_repo or github_repo in seen_repos:
-                continue
-            
-            seen_repos.add(github_repo)
-            repo_list.append({
+        return [
+            {
                 "name": github_repo,
                 "language": "Python",
                 "package_name": pkg.get("name"),
                 "weekly_downloads": pkg.get("weekly_downloads", 0),
                 "registry": "pypi",
-            })
-        
-        return repo_list
+            }
+            for github_repo, pkg in self._packages_by_repo(packages).items()
+        ]
 
 
 class MavenClient(PackageRegistryClient):
@@ -616,6 +936,8 @@ class MavenClient(PackageRegistryClient):
     """
     
     LIBRARIES_IO_URL = "https://libraries.io/api"
+    # Maven Central has no download counts; min_downloads filters on dependents instead
+    POPULARITY_KEY = "dependents_count"
     MAVEN_CENTRAL_URL = "https://repo1.maven.org/maven2"
     MAVEN_SEARCH_URL = "https://search.maven.org/solrsearch/select"
     
@@ -629,6 +951,8 @@ class MavenClient(PackageRegistryClient):
         self.registry_name = "maven"
         self.api_key = api_key or os.environ.get("LIBRARIES_IO_API_KEY")
         self.page_size = 100  # Libraries.io max per request
+        self.rate_limiter = RateLimiter(60, 60.0)  # Libraries.io allows 60 req/min
+        self.pom_rate_limiter = RateLimiter(30, 1.0)  # Stay well under Maven Central's soft limit
     
     async def search_popular_packages(
         self, 
@@ -677,65 +1001,66 @@ class MavenClient(PackageRegistryClient):
                     "page": page,
                 }
                 
+                await self.rate_limiter.acquire()
+                # Only the request holds a semaphore slot; the 429 backoff below waits outside it
                 async with self.sem:
                     try:
                         response = await client.get(
                             f"{self.LIBRARIES_IO_URL}/search",
                             params=params
                         )
-                        
-                        if response.status_code == 200:
-                            data = response.json()
-                            
-                            if not data:
-                                break
-                            
-                            for pkg in data:
-                                # Extract GitHub repo from repository_url
-                                repo_url = pkg.get("repository_url", "")
-                                github_repo = self.parse_github_url(repo_url) if repo_url else None
-                                
-                                # Maven packages use groupId:artifactId naming
-                                name = pkg.get("name", "")
-                                
-                                packages.append({
-                                    "name": name,
-                                    "version": pkg.get("latest_release_number"),
-                                    "description": (pkg.get("description") or "")[:200],
-                                    "platform": pkg.get("platform"),
-                                    "language": pkg.get("language", "Java"),
-                                    "licenses": pkg.get("licenses"),
-                                    "homepage": pkg.get("homepage"),
-                                    "repository_url": repo_url,
-                                    "github_repo": github_repo,
-                                    "dependents_count": pkg.get("dependents_count", 0),
-                                    "dependent_repos_count": pkg.get("dependent_repos_count", 0),
-                                    "stars": pkg.get("stars", 0),
-                                    "rank": pkg.get("rank", 0),
-                                    "latest_release_published_at": pkg.get("latest_release_published_at"),
-                                    # Use dependents_count as popularity metric
-                                    "weekly_downloads": pkg.get("dependents_count", 0),
-                                })
-                            
-                            progress.update(task, completed=min(len(packages), max_results))
-                            page += 1
-                            
-                            # Rate limiting: Libraries.io allows 60 req/min
-                            await asyncio.sleep(1.0)
-                            
-                        elif response.status_code == 401:
-                            console.print("[red]Invalid Libraries.io API key.[/red]")
-                            break
-                        elif response.status_code == 429:
-                            console.print("[yellow]Rate limited by Libraries.io. Waiting 60s...[/yellow]")
-                            await asyncio.sleep(60)
-                        else:
-                            console.print(f"[yellow]Libraries.io API returned {response.status_code}[/yellow]")
-                            break
-                            
                     except httpx.RequestError as e:
                         console.print(f"[red]Libraries.io API error: {e}[/red]")
                         break
+                self.sem.record(response.status_code)
+                
+                if response.status_code == 200:
+                    data = _parse_json(response.content)
+                    
+                    if not data:
+                        break
+                    
+                    for pkg in data:
+                        # Extract GitHub repo from repository_url
+                        repo_url = pkg.get("repository_url", "")
+                        github_repo = self.parse_github_url(repo_url) if repo_url else None
+                        
+                        # Maven packages use groupId:artifactId naming
+                        name = pkg.get("name", "")
+                        
+                        packages.append({
+                            "name": name,
+                            "version": pkg.get("latest_release_number"),
+                            "description": (pkg.get("description") or "")[:200],
+                            "platform": pkg.get("platform"),
+                            "language": pkg.get("language", "Java"),
+                            "licenses": pkg.get("licenses"),
+                            "homepage": pkg.get("homepage"),
+                            "repository_url": repo_url,
+                            "github_repo": github_repo,
+                            "dependents_count": pkg.get("dependents_count", 0),
+                            "dependent_repos_count": pkg.get("dependent_repos_count", 0),
+                            "stars": pkg.get("stars", 0),
+                            "rank": pkg.get("rank", 0),
+                            "latest_release_published_at": pkg.get("latest_release_published_at"),
+                            # Use dependents_count as popularity metric
+                            "weekly_downloads": pkg.get("dependents_count", 0),
+                        })
+                    
+                    progress.update(task, completed=min(len(packages), max_results))
+                    page += 1
+                    
+                elif response.status_code == 401:
+                    console.print("[red]Invalid Libraries.io API key.[/red]")
+                    break
+                elif response.status_code == 429:
+                    retry_after = response.headers.get("Retry-After", "")
+                    delay = int(retry_after) if retry_after.isdigit() else 60
+                    console.print(f"[yellow]Rate limited by Libraries.io. Waiting {delay}s...[/yellow]")
+                    await asyncio.sleep(delay)
+                else:
+                    console.print(f"[yellow]Libraries.io API returned {response.status_code}[/yellow]")
+                    break
         
         # Trim to max_results
         packages = packages[:max_results]
@@ -743,7 +1068,8 @@ class MavenClient(PackageRegistryClient):
         console.print(f"[green]Found {len(packages)} Maven packages[/green]")
         
         # Try to resolve GitHub repos for packages without repository_url
-        packages = await self._resolve_github_repos_from_pom(packages)
+        previous = self._load_stale_cache(cache_key) if use_cache else {}
+        packages = await self._resolve_github_repos_from_pom(packages, previous)
         
         # Save to cache
         if use_cache and packages:
@@ -753,23 +1079,34 @@ class MavenClient(PackageRegistryClient):
     
     async def _resolve_github_repos_from_pom(
         self, 
-        packages: List[Dict[str, Any]]
+        packages: List[Dict[str, Any]],
+        previous: Optional[Dict[str, Dict[str, Any]]] = None
     ) -> List[Dict[str, Any]]:
         """
         Try to resolve GitHub repos by fetching POM files for packages
-        that don't have a repository_url from Libraries.io.
+        that don't have a repository_url from Libraries.io. Versions already
+        resolved in `previous` are reused, since published POMs don't change;
+        for the same reason, versions whose POM named no repo aren't fetched again.
         """
+        previous = previous or {}
         packages_needing_lookup = [
-            (i, pkg) for i, pkg in enumerate(packages) 
+            pkg for pkg in packages
             if not pkg.get("github_repo") and ":" in pkg.get("name", "")
+            and not self._reuse_github_repo(pkg, previous)
+            and not self._reuse_pom_miss(pkg, previous)
         ]
         
         if not packages_needing_lookup:
             return packages
         
+        # A coordinate listed more than once (e.g. on two search pages) is fetched once
+        by_coordinate: Dict[Tuple[str, Any], List[Dict[str, Any]]] = {}
+        for pkg in packages_needing_lookup:
+            by_coordinate.setdefault((pkg["name"], pkg.get("version")), []).append(pkg)
+        
         # Limit POM lookups to avoid excessive requests
-        max_pom_lookups = min(len(packages_needing_lookup), 100)
-        packages_needing_lookup = packages_needing_lookup[:max_pom_lookups]
+        max_pom_lookups = min(len(by_coordinate), 100)
+        packages_needing_lookup = [duplicates[0] for duplicates in by_coordinate.values()][:max_pom_lookups]
         
         console.print(f"[dim]Resolving GitHub repos from POM files for {len(packages_needing_lookup)} packages...[/dim]")
         
@@ -781,104 +1118,191 @@ class MavenClient(PackageRegistryClient):
                 total=len(packages_needing_lookup)
             )
             
-            for idx, pkg in packages_needing_lookup:
-                name = pkg.get("name", "")
-                version = pkg.get("version")
-                
-                if ":" not in name or not version:
-                    progress.update(task, advance=1)
-                    continue
-                
-                group_id, artifact_id = name.split(":", 1)
-                
-                # Convert groupId to path (com.google.guava -> com/google/guava)
-                group_path = group_id.replace(".", "/")
-                pom_url = f"{self.MAVEN_CENTRAL_URL}/{group_path}/{artifact_id}/{version}/{artifact_id}-{version}.pom"
-                
-                async with self.sem:
-                    try:
-                        response = await client.get(pom_url)
-                        
-                        if response.status_code == 200:
-                            pom_content = response.text
-                            github_repo = self._parse_github_from_pom(pom_content)
-                            if github_repo:
-                                packages[idx]["github_repo"] = github_repo
-                        
-                        progress.update(task, advance=1)
-                        await asyncio.sleep(0.05)
-                        
-                    except httpx.RequestError:
-                        progress.update(task, advance=1)
+            # Fetches run concurrently, bounded by the semaphore in _lookup_pom_github_repo
+            await asyncio.gather(*(
+                self._lookup_pom_github_repo(client, pkg, progress, task)
+                for pkg in packages_needing_lookup
+            ))
+        
+        for first, *duplicates in by_coordinate.values():
+            for pkg in duplicates:
+                for key in ("github_repo", "pom_checked"):
+                    if key in first:
+                        pkg[key] = first[key]
         
         return packages
     
-    def _parse_github_from_pom(self, pom_content: str) -> Optional[str]:
+    async def _lookup_pom_github_repo(
+        self,
+        client: httpx.AsyncClient,
+        pkg: Dict[str, Any],
+        progress: Progress,
+        task: TaskID
+    ):
+        """Set a package's github_repo from the POM published for its version."""
+        name = pkg.get("name", "")
+        version = pkg.get("version")
+        
+        if ":" not in name or not version:
+            progress.update(task, advance=1)
+            return
+        
+        group_id, artifact_id = name.split(":", 1)
+        
+        # Convert groupId to path (com.google.guava -> com/google/guava)
+        group_path = group_id.replace(".", "/")
+        pom_url = f"{self.MAVEN_CENTRAL_URL}/{group_path}/{artifact_id}/{version}/{artifact_id}-{version}.pom"
+        
+        # A 429/503 is retried once, after the wait Maven Central asks for
+        for attempt in range(2):
+            await self.pom_rate_limiter.acquire()
+            async with self.sem:
+                try:
+                    async with client.stream("GET", pom_url) as response:
+                        status = response.status_code
+                        self.sem.record(status)
+                        retry_after = response.headers.get("Retry-After", "")
+                        github_repo = await self._stream_pom_github_repo(response) if status == 200 else None
+                except httpx.RequestError:
+                    status, github_repo = None, None
+            
+            if status not in (429, 503) or attempt:
+                break
+            # Waits outside the semaphore so other lookups keep their slots
+            await asyncio.sleep(int(retry_after) if retry_after.isdigit() else POM_RETRY_DELAY)
+        
+        if github_repo:
+            pkg["github_repo"] = github_repo
+        elif status == 200:
+            # Saved with the package cache, so the next refresh skips this version
+            pkg["pom_checked"] = True
+        
+        progress.update(task, advance=1)
+    
+    @staticmethod
+    def _reuse_pom_miss(pkg: Dict[str, Any], previous: Dict[str, Dict[str, Any]]) -> bool:
+        """
+        Carry over a previous fetch's finding that this version's POM names
+        no GitHub repo. Returns True when the lookup can be skipped.
+        """
+        cached = previous.get(pkg.get("name"))
+        if not cached or not cached.get("pom_checked") or cached.get("version") != pkg.get("version"):
+            return False
+        
+        pkg["pom_checked"] = True
+        return True
+    
+    async def _stream_pom_github_repo(self, response: httpx.Response) -> Optional[str]:
+        """
+        Read a streamed 200 POM response and extract its GitHub repo.
+        
+        The SCM section sits near the top of most POMs, so once its closing
+        tag arrives the partial document is parsed and the rest of the
+        download is skipped if that resolves. POMs over MAX_POM_SIZE_BYTES
+        are treated as having no repo.
+        """
+        content_length = response.headers.get("Content-Length", "")
+        if content_length.isdigit() and int(content_length) > MAX_POM_SIZE_BYTES:
+            return None
+        
+        pom = bytearray()
+        scm_checked = False
+        async for chunk in response.aiter_bytes():
+            pom += chunk
+            if len(pom) > MAX_POM_SIZE_BYTES:
+                return None
+            # Look back past the chunk boundary in case the tag straddles it
+            if not scm_checked and b"</scm>" in pom[-len(chunk) - 5:]:
+                scm_checked = True
+                github_repo = await asyncio.to_thread(self._parse_github_from_pom, bytes(pom))
+                if github_repo:
+                    return github_repo
+        
+        # Parsing runs off the event loop so the other POM downloads keep progressing
+        return await asyncio.to_thread(self._parse_github_from_pom, bytes(pom))
+    
+    def _parse_github_from_pom(self, pom_content: bytes) -> Optional[str]:
         """
         Extract GitHub repository URL from POM XML content.
         
-        Looks for SCM URL, project URL, or issue tracker URL.
+        Looks for SCM URL, project URL, or issue tracker URL, in one pass
+        over the raw bytes (the XML declaration names the encoding).
+        Malformed POMs fall back to regex scanning.
         """
-        # Try SCM URL first (most reliable)
-        scm_patterns = [
-            r"<scm>.*?<url>([^<]+)</url>.*?</scm>",
-            r"<scm>.*?<connection>([^<]+)</connection>.*?</scm>",
-            r"<scm>.*?<developerConnection>([^<]+)</developerConnection>.*?</scm>",
-        ]
+        # Most POMs never mention GitHub; one byte search rules them out before any parsing
+        if b"github" not in pom_content:
+            return None
+        
+        try:
+            return self._parse_github_from_pom_xml(pom_content)
+        except ET.ParseError:
+            return self._parse_github_from_pom_regex(pom_content)
+    
+    def _parse_github_from_pom_xml(self, pom_content: bytes) -> Optional[str]:
+        """Stream the POM, returning as soon as an SCM URL resolves."""
+        # First text seen at each lower-priority location
+        candidates = {}
+        tags = []
+        
+        for event, elem in ET.iterparse(io.BytesIO(pom_content), events=("start", "end")):
+            tag = elem.tag.rsplit("}", 1)[-1]
+            if event == "start":
+                tags.append(tag)
+                continue
+            
+            tags.pop()
+            text = (elem.text or "").strip()
+            if text:
+                if "scm" in tags and tag in _POM_SCM_TAGS:
+                    github_repo = self.parse_github_url(text) if tag == "url" else None
+                    if github_repo:
+                        return github_repo
+                    candidates.setdefault(tag, text)
+                if tag == "url":
+                    if "github" in text.lower():
+                        candidates.setdefault("project", text)
+                    if "issueManagement" in tags:
+                        candidates.setdefault("issueManagement", text)
+            elem.clear()
+        
+        for key in ("connection", "developerConnection", "project", "issueManagement"):
+            github_repo = self.parse_github_url(candidates.get(key))
+            if github_repo:
+                return github_repo
         
-        for pattern in scm_patterns:
-            match = re.search(pattern, pom_content, re.DOTALL | re.IGNORECASE)
-            if match:
-                github_repo = self.parse_github_url(match.group(1))
+        return None
+    
+    def _parse_github_from_pom_regex(self, pom_content: bytes) -> Optional[str]:
+        """Regex scan for POMs the XML parser rejects."""
+        # Try SCM URL first (most reliable), then its connection strings;
+        # one pass finds the section and one over it collects all three
+        scm_match = _SCM_SECTION_RE.search(pom_content)
+        if scm_match:
+            scm_tags = {}
+            for match in _SCM_TAG_RE.finditer(scm_match.group(1)):
+                scm_tags.setdefault(match.group(1).lower(), match.group(2))
+            for tag in _POM_SCM_TAGS:
+                text = scm_tags.get(tag.lower().encode())
+                github_repo = self.parse_github_url(text.decode("utf-8", errors="replace")) if text else None
                 if github_repo:
                     return github_repo
         
         # Fallback to project URL
-        url_match = re.search(r"<url>([^<]*github[^<]+)</url>", pom_content, re.IGNORECASE)
+        url_match = _PROJECT_URL_RE.search(pom_content)
         if url_match:
-            github_repo = self.parse_github_url(url_match.group(1))
+            github_repo = self.parse_github_url(url_match.group(1).decode("utf-8", errors="replace"))
             if github_repo:
                 return github_repo
         
         # Try issue management URL
-        issue_match = re.search(r"<issueManagement>.*?<url>([^<]+)</url>.*?</issueManagement>", 
-                               pom_content, re.DOTALL | re.IGNORECASE)
+        issue_match = _ISSUE_MGMT_RE.search(pom_content)
         if issue_match:
-            github_repo = self.parse_github_url(issue_match.group(1))
+            github_repo = self.parse_github_url(issue_match.group(1).decode("utf-8", errors="replace"))
             if github_repo:
                 return github_repo
         
         return None
     
-    def filter_github_packages(
-        self, 
-        packages: List[Dict[str, Any]],
-        min_downloads: int = 0
-    ) -> Tuple[List[Dict[str, Any]], int]:
-        """
-        Filter packages to only those with GitHub repos and optional minimum dependents.
-        
-        Note: For Maven, min_downloads refers to dependents_count (not download count).
-        
-        Returns:
-            Tuple of (filtered packages, count of skipped packages)
-        """
-        filtered = []
-        skipped = 0
-        
-        for pkg in packages:
-            if not pkg.get("github_repo"):
-                skipped += 1
-                continue
-            
-            if pkg.get("dependents_count", 0) < min_downloads:
-                skipped += 1
-                continue
-            
-            filtered.append(pkg)
-        
-        return filtered, skipped
-    
     def to_repo_list(self, packages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
         Convert Maven packages to the format expected by GitHubClient.fetch_batch().
@@ -890,21 +1314,13 @@ class MavenClient(PackageRegistryClient):
         - weekly_downloads: dependents_count (used as popularity proxy)
         - registry: "maven"
         """
-        repo_list = []
-        seen_repos = set()  # Deduplicate repos (multiple packages can share a repo)
-        
-        for pkg in packages:
-            github_repo = pkg.get("github_repo")
-            if not github_repo or github_repo in seen_repos:
-                continue
-            
-            seen_repos.add(github_repo)
-            repo_list.append({
+        return [
+            {
                 "name": github_repo,
                 "language": pkg.get("language", "Java"),
                 "package_name": pkg.get("name"),
                 "weekly_downloads": pkg.get("dependents_count", 0),
                 "registry": "maven",
-            })
-        
-        return repo_list
+            }
+            for github_repo, pkg in self._packages_by_repo(packages).items()
+        ]
@@ -0,0 +1,239 @@
+"""
+Simple tests for the CLI display and export helpers.
+"""
+
+import sqlite3
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import polars as pl
+import pytest
+from rich.style import Style
+
+from src import cli
+from src.cli import _export_to_sqlite, _format_for_display, _registry_rows
+from src.processing import compute_risk_metrics
+
+
+def _raw_result(repo, contributions, weekly_downloads=None):
+    result = {
+        "repo": repo,
+        "status": "success",
+        "data": {"all": [1] * 52},
+        "contributions": contributions,
+        "contributor_count": len(contributions),
+        "contributor_data_available": bool(contributions),
+        "language": "Python",
+    }
+    if weekly_downloads is not None:
+        result.update(package_name=repo.split("/")[1], weekly_downloads=weekly_downloads, registry="npm")
+    return result
+
+
+class TestFormatForDisplay:
+    """Tests for the vectorized table cell formatting."""
+    
+    def test_formats_metrics(self):
+        df = compute_risk_metrics([_raw_result("owner/repo", [90, 10], weekly_downloads=2_500_000)])
+        row = _format_for_display(df, 30).row(0, named=True)
+        
+        assert row["repo_url"] == "https://github.com/owner/repo"
+        assert row["level_style"] in {"red bold", "orange1", "yellow", "green"}
+        assert row["velocity_str"] == "1.00x"
+        assert row["top1_str"] == "90%"
+        assert row["contrib_str"] == "2"
+        assert row["dl_str"] == "2.5M"
+        assert row["package_str"] == "repo"
+    
+    def test_missing_contributor_data(self):
+        df = compute_risk_metrics([_raw_result("owner/repo", [])])
+        row = _format_for_display(df, 30).row(0, named=True)
+        
+        assert (row["gini_str"], row["gini_style"]) == ("N/A", "dim")
+        assert (row["top1_str"], row["top1_style"]) == ("N/A", "dim")
+        assert (row["contrib_str"], row["contrib_style"]) == ("?", "dim")
+        assert "dl_str" not in row
+    
+    def test_download_suffixes(self):
+        df = compute_risk_metrics([
+            _raw_result(f"owner/repo{i}", [1], weekly_downloads=downloads)
+            for i, downloads in enumerate([999, 1_500, 3_000_000_000])
+        ])
+        
+        npm = _format_for_display(df, 30).sort("weekly_downloads")["dl_str"].to_list()
+        pypi = _format_for_display(df, 30, billions=True).sort("weekly_downloads")["dl_str"].to_list()
+        
+        assert npm == ["999", "2K", "3000.0M"]
+        assert pypi == ["999", "2K", "3.0B"]
+    
+    def test_registry_rows_use_text(self):
+        df = compute_risk_metrics([_raw_result("owner/repo", [90, 10], weekly_downloads=10)])
+        cells = next(_registry_rows(_format_for_display(df, 30)))
+        
+        assert [str(cell) for cell in cells[:2]] == ["repo", "owner/repo"]
+        assert cells[1].spans[0].style.link == "https://github.com/owner/repo"
+        assert cells[6].spans[0].style == Style.parse("green")
+    
+    def test_limits_rows(self):
+        df = compute_risk_metrics([_raw_result(f"owner/repo{i}", [1, 2]) for i in range(5)])
+        assert _format_for_display(df, 3).height == 3
+
+
+class TestExportToSqlite:
+    """Tests for the SQLite upsert export."""
+    
+    def test_creates_table_and_upserts(self, tmp_path):
+        db_path = str(tmp_path / "risk.db")
+        
+        _export_to_sqlite(compute_risk_metrics([_raw_result("owner/repo", [1, 1])]), db_path)
+        _export_to_sqlite(compute_risk_metrics([_raw_result("owner/repo", [9, 1])]), db_path)
+        
+        conn = sqlite3.connect(db_path)
+        rows = conn.execute("SELECT repo, top1_share, all_commits FROM risk_report").fetchall()
+        conn.close()
+        
+        assert len(rows) == 1
+        assert rows[0][0] == "owner/repo"
+        assert rows[0][1] == 0.9
+        assert rows[0][2] == "[" + ",".join(["1"] * 52) + "]"
+    
+    def test_adds_missing_registry_columns(self, tmp_path):
+        db_path = str(tmp_path / "risk.db")
+        
+        # A table left by an older version, without registry fields
+        conn = sqlite3.connect(db_path)
+        conn.execute("CREATE TABLE risk_report (repo TEXT, total_risk_score REAL)")
+        conn.execute("CREATE UNIQUE INDEX idx_repo ON risk_report(repo)")
+        conn.commit()
+        conn.close()
+        
+        _export_to_sqlite(compute_risk_metrics([_raw_result("owner/a", [1])]), db_path)
+        _export_to_sqlite(compute_risk_metrics([_raw_result("owner/b", [1], weekly_downloads=10)]), db_path)
+        
+        conn = sqlite3.connect(db_path)
+        rows = conn.execute("SELECT repo, registry, weekly_downloads FROM risk_report ORDER BY repo").fetchall()
+        conn.close()
+        
+        assert rows == [("owner/a", None, None), ("owner/b", "npm", 10)]
+
+    
+    def test_update_keeps_columns_not_in_frame(self, tmp_path):
+        db_path = str(tmp_path / "risk.db")
+        
+        # A GitHub-only rescan updates metrics but leaves the registry fields alone
+        _export_to_sqlite(compute_risk_metrics([_raw_result("owner/repo", [1], weekly_downloads=10)]), db_path)
+        _export_to_sqlite(compute_risk_metrics([_raw_result("owner/repo", [5, 5])]), db_path)
+        
+        conn = sqlite3.connect(db_path)
+        rows = conn.execute("SELECT repo, contributor_count, registry, weekly_downloads FROM risk_report").fetchall()
+        conn.close()
+        
+        assert rows == [("owner/repo", 2, "npm", 10)]
+    
+    def test_raises_when_database_stays_locked(self, tmp_path):
+        db_path = str(tmp_path / "risk.db")
+        df = compute_risk_metrics([_raw_result("owner/repo", [1])])
+        _export_to_sqlite(df, db_path)
+        
+        # Another writer holds the lock past the busy timeout
+        blocker = sqlite3.connect(db_path, isolation_level=None)
+        blocker.execute("BEGIN IMMEDIATE")
+        conn = cli._connect_sqlite(db_path)
+        conn.execute("PRAGMA busy_timeout=0")
+        
+        with pytest.raises(sqlite3.OperationalError, match="locked"):
+            cli._upsert_rows(conn, df)
+        assert not conn.in_transaction
+        
+        conn.close()
+        blocker.close()
+    
+    def test_truncates_wal_after_export(self, tmp_path):
+        db_path = tmp_path / "risk.db"
+        
+        _export_to_sqlite(compute_risk_metrics([_raw_result("owner/repo", [1])]), str(db_path))
+        
+        wal_path = tmp_path / "risk.db-wal"
+        assert not wal_path.exists() or wal_path.stat().st_size == 0
+    
+    def test_skips_non_report_columns(self, tmp_path):
+        db_path = str(tmp_path / "risk.db")
+        df = compute_risk_metrics([_raw_result("owner/repo", [1])]).with_columns(repo_url=pl.lit("x"))
+        
+        _export_to_sqlite(df, db_path)
+        
+        conn = sqlite3.connect(db_path)
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(risk_report)")}
+        conn.close()
+        
+        assert "repo_url" not in columns
+        assert {"repo", "total_risk_score", "updated_at"} <= columns
+
+
+class TestScanRegistry:
+    """Tests for the shared registry scan flow."""
+    
+    @pytest.mark.asyncio
+    async def test_enriches_and_exports_results(self, tmp_path):
+        registry_client = MagicMock()
+        registry_client.search_popular_packages = AsyncMock(return_value=[{"name": "pkg"}])
+        registry_client.filter_github_packages.return_value = ([{"name": "pkg"}], 0)
+        registry_client.to_repo_list.return_value = [
+            {"name": "owner/repo", "package_name": "pkg", "weekly_downloads": 500, "registry": "npm"},
+        ]
+        registry_client.close = AsyncMock()
+        
+        github_client = MagicMock()
+        github_client.warmup = AsyncMock(return_value={"limit": 5000, "remaining": 4999})
+        
+        async def fetch_batch_streamed(repo_list):
+            yield [_raw_result("owner/repo", [3, 1])]
+        
+        github_client.fetch_batch_streamed = fetch_batch_streamed
+        github_client.close = AsyncMock()
+        
+        display_fn = MagicMock()
+        
+        db_path = str(tmp_path / "risk.db")
+        with patch.object(cli, "_connect_sqlite", side_effect=lambda _: sqlite3.connect(db_path, check_same_thread=False)):
+            await cli._scan_registry(
+                registry_client,
+                github_client,
+                limit=10,
+                min_filter=0,
+                use_cache=False,
+                display_fn=display_fn,
+                label="NPM",
+                filter_label="weekly downloads",
+            )
+        
+        df = display_fn.call_args[0][0]
+        assert df["package_name"].to_list() == ["pkg"]
+        assert df["weekly_downloads"].to_list() == [500]
+        assert df["registry"].to_list() == ["npm"]
+        
+        conn = sqlite3.connect(db_path)
+        rows = conn.execute("SELECT repo, package_name, weekly_downloads FROM risk_report").fetchall()
+        conn.close()
+        assert rows == [("owner/repo", "pkg", 500)]
+        registry_client.close.assert_awaited_once()
+        github_client.close.assert_awaited_once()
+    
+    @pytest.mark.asyncio
+    async def test_stream_skips_export_without_contributor_data(self, tmp_path):
+        github_client = MagicMock()
+        
+        async def fetch_batch_streamed(repo_list):
+            yield [_raw_result("owner/a", [3, 1]), _raw_result("owner/b", [])]
+        
+        github_client.fetch_batch_streamed = fetch_batch_streamed
+        
+        db_path = str(tmp_path / "risk.db")
+        with patch.object(cli, "_connect_sqlite", side_effect=lambda _: sqlite3.connect(db_path, check_same_thread=False)):
+            df = await cli._stream_risk_metrics(github_client, [], db_path)
+        
+        assert sorted(df["repo"].to_list()) == ["owner/a", "owner/b"]
+        
+        conn = sqlite3.connect(db_path)
+        rows = conn.execute("SELECT repo FROM risk_report").fetchall()
+        conn.close()
+        assert rows == [("owner/a",)]
@@ -0,0 +1,55 @@
+"""
+Simple tests for the risk metric calculations.
+"""
+
+import pytest
+
+from src.processing import calculate_gini_coefficient, calculate_top_contributor_share, compute_risk_metrics
+
+
+class TestContributionMetrics:
+    """Tests for the vectorized Gini and top contributor shares."""
+    
+    @pytest.mark.parametrize("contributions", [[5], [0, 0], [90, 10], [3, 1, 0], [100, 50, 25, 1], list(range(40))])
+    def test_matches_scalar_helpers(self, contributions):
+        df = compute_risk_metrics([{
+            "repo": "owner/repo",
+            "status": "success",
+            "data": {"all": [1] * 52},
+            "contributions": contributions,
+            "contributor_count": len(contributions),
+            "contributor_data_available": True,
+        }])
+        row = df.row(0, named=True)
+        shares = calculate_top_contributor_share(contributions)
+        
+        assert row["gini_coefficient"] == pytest.approx(calculate_gini_coefficient(contributions))
+        assert row["top1_share"] == pytest.approx(shares["top1_share"])
+        assert row["top3_share"] == pytest.approx(shares["top3_share"])
+        assert "contributions" not in df.columns
+    
+    def test_missing_contributor_data_stays_null(self):
+        df = compute_risk_metrics([{
+            "repo": "owner/repo",
+            "status": "success",
+            "data": {"all": [1] * 52},
+            "contributions": [],
+            "contributor_data_available": False,
+        }])
+        row = df.row(0, named=True)
+        
+        assert (row["gini_coefficient"], row["top1_share"], row["top3_share"]) == (None, None, None)
+        assert row["risk_gini"] == 3.0
+    
+    def test_registry_fields_present_on_some_results(self):
+        results = [
+            {"repo": f"owner/repo{i}", "status": "success", "data": {"all": [1] * 52}, "contributions": [1]}
+            for i in range(150)
+        ]
+        results[-1].update(package_name="pkg", weekly_downloads=10, registry="npm")
+        
+        df = compute_risk_metrics(results)
+        
+        assert df["weekly_downloads"].null_count() == 149
+        assert df.row(149, named=True)["package_name"] == "pkg"
+        assert "package_name" not in compute_risk_metrics(results[:1]).columns
@@ -2,11 +2,16 @@
 Simple tests for the registry clients (NPM, PyPI, Maven) and GitHub client.
 """
 
+import asyncio
+import json
+import os
+import sqlite3
+import httpx
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
 from pathlib import Path
 
-from src.registry_clients import NPMClient, PyPIClient, MavenClient, PackageRegistryClient
+from src.registry_clients import NPMClient, PyPIClient, MavenClient, PackageRegistryClient, RateLimiter, ConcurrencyLimiter, _store_etag_entry
 from src.ingestion import GitHubClient
 
 
@@ -33,6 +38,10 @@ class TestParseGitHubUrl:
         url = "github:axios/axios"
         assert PackageRegistryClient.parse_github_url(url) == "axios/axios"
     
+    def test_github_shorthand_keeps_inner_git(self):
+        url = "github:owner/site.github.io.git"
+        assert PackageRegistryClient.parse_github_url(url) == "owner/site.github.io"
+    
     def test_simple_owner_repo_format(self):
         url = "microsoft/typescript"
         assert PackageRegistryClient.parse_github_url(url) == "microsoft/typescript"
@@ -60,7 +69,7 @@ class TestNPMClient:
     def test_client_initialization(self, npm_client):
         assert npm_client.registry_name == "npm"
         assert npm_client.page_size == 250
-        assert npm_client.sem._value == 5
+        assert npm_client.sem.limit == 5
     
     def test_filter_github_packages(self, npm_client):
         packages = [
@@ -89,6 +98,116 @@ class TestNPMClient:
         assert repo_list[0]["name"] == "facebook/react"
         assert repo_list[0]["language"] == "JavaScript"
         assert repo_list[0]["registry"] == "npm"
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_lookups_share_one_request(self, npm_client):
+        """Test that concurrent metadata lookups for one package are coalesced."""
+        response = MagicMock(status_code=200, headers={}, content=b'{"repository": {"url": "git+https://github.com/facebook/react.git"}}')
+        
+        async def slow_get(url, headers):
+            await asyncio.sleep(0)
+            return response
+        
+        with patch.object(npm_client, '_get_client') as mock_get_client:
+            mock_client = AsyncMock()
+            mock_client.get.side_effect = slow_get
+            mock_get_client.return_value = mock_client
+            
+            results = await asyncio.gather(*(npm_client._get_package("react") for _ in range(3)))
+        
+        assert mock_client.get.await_count == 1
+        assert all(result is results[0] for result in results)
+        assert npm_client._inflight == {}
+    
+    @pytest.mark.asyncio
+    async def test_cancelled_lookup_leaves_shared_fetch_running(self, npm_client):
+        """Test that cancelling one waiter doesn't cancel the fetch for the others."""
+        response = MagicMock(status_code=200, headers={}, content=b'{"repository": "github:facebook/react"}')
+        release = asyncio.Event()
+        
+        async def slow_get(url, headers):
+            await release.wait()
+            return response
+        
+        with patch.object(npm_client, '_get_client') as mock_get_client:
+            mock_client = AsyncMock()
+            mock_client.get.side_effect = slow_get
+            mock_get_client.return_value = mock_client
+            
+            cancelled = asyncio.ensure_future(npm_client._get_package("react"))
+            waiting = asyncio.ensure_future(npm_client._get_package("react"))
+            await asyncio.sleep(0)
+            cancelled.cancel()
+            release.set()
+            
+            result = await waiting
+        
+        assert cancelled.cancelled()
+        assert result == {"repository": "github:facebook/react"}
+    
+    @pytest.mark.asyncio
+    async def test_resolve_reuses_unchanged_versions_from_stale_cache(self, npm_client):
+        """Test that expired cache entries skip the lookup when the version is unchanged."""
+        npm_client._save_cache("npm_popular_2", [
+            {"name": "same", "version": "1.0.0", "github_repo": "owner/same"},
+            {"name": "bumped", "version": "1.0.0", "github_repo": "owner/old"},
+        ])
+        packages = [
+            {"name": "same", "version": "1.0.0", "repository": None},
+            {"name": "bumped", "version": "2.0.0", "repository": None},
+        ]
+        
+        with patch.object(npm_client, '_get_package', AsyncMock(return_value={"repository": "github:owner/new"})) as get_package:
+            resolved = await npm_client._resolve_github_repos(packages, npm_client._load_stale_cache("npm_popular_2"))
+        
+        get_package.assert_awaited_once_with("bumped")
+        assert [pkg["github_repo"] for pkg in resolved] == ["owner/same", "owner/new"]
+    
+    @pytest.mark.asyncio
+    async def test_search_dedupes_packages_across_terms(self, npm_client):
+        """Test that every search term is paged and shared packages are kept once."""
+        def search_response(url, params):
+            names = ["shared", params["text"]] if params["from"] == 0 else []
+            response = MagicMock(status_code=200)
+            response.content = json.dumps({"objects": [
+                {"package": {"name": name, "links": {"repository": f"https://github.com/owner/{name}"}},
+                 "downloads": {"weekly": len(name)}}
+                for name in names
+            ]}).encode()
+            return response
+        
+        with patch.object(npm_client, '_get_client') as mock_get_client:
+            mock_client = AsyncMock()
+            mock_client.get.side_effect = search_response
+            mock_get_client.return_value = mock_client
+            
+            packages = await npm_client.search_popular_packages(max_results=100, use_cache=False)
+        
+        names = [pkg["name"] for pkg in packages]
+        assert len(names) == 9
+        assert names.count("shared") == 1
+        assert "keywords:library" in names
+    
+    @pytest.mark.asyncio
+    async def test_search_pages_are_capped_by_total(self, npm_client):
+        """Test that pages past the first stop at the term's total match count."""
+        def search_response(url, params):
+            total = 600 if params["text"] == "keywords:javascript" else 100
+            return MagicMock(status_code=200, content=json.dumps({"total": total, "objects": []}).encode())
+        
+        with patch.object(npm_client, '_get_client') as mock_get_client:
+            mock_client = AsyncMock()
+            mock_client.get.side_effect = search_response
+            mock_get_client.return_value = mock_client
+            
+            await npm_client.search_popular_packages(max_results=5000, use_cache=False)
+        
+        pages = [
+            (call.kwargs["params"]["text"], call.kwargs["params"]["from"], call.kwargs["params"]["size"])
+            for call in mock_client.get.call_args_list
+        ]
+        assert len(pages) == 8 + 2
+        assert pages[8:] == [("keywords:javascript", 250, 250), ("keywords:javascript", 500, 100)]
 
 
 class TestPyPIClient:
@@ -127,6 +246,88 @@ class TestPyPIClient:
         assert repo_list[0]["name"] == "psf/requests"
         assert repo_list[0]["language"] == "Python"
         assert repo_list[0]["registry"] == "pypi"
+    
+    @pytest.mark.asyncio
+    async def test_not_modified_details_are_served_from_cache(self, pypi_client):
+        """Test that a 304 for a package document reuses the cached info object."""
+        body = {
+            "info": {"version": "1.0", "home_page": "https://github.com/owner/pkg", "description": "# README"},
+            "releases": {"1.0": []},
+        }
+        fresh = MagicMock(status_code=200, headers={"ETag": '"v1"'}, content=json.dumps(body).encode())
+        not_modified = MagicMock(status_code=304, headers={})
+        client = AsyncMock()
+        client.get.side_effect = [fresh, not_modified]
+        
+        first = await pypi_client._fetch_package_details(client, "pkg", 10)
+        second = await pypi_client._fetch_package_details(client, "pkg", 20)
+        await pypi_client.close()
+        
+        assert first["github_repo"] == second["github_repo"] == "owner/pkg"
+        assert second["weekly_downloads"] == 20
+        assert client.get.call_args_list[1].kwargs["headers"] == {"If-None-Match": '"v1"'}
+        
+        conn = sqlite3.connect(pypi_client.cache_dir / "registry_etags.db")
+        body = conn.execute("SELECT body FROM kv").fetchone()[0]
+        assert "releases" not in body and "description" not in body
+        conn.close()
+    
+    @pytest.mark.asyncio
+    async def test_locked_cache_falls_back_to_plain_request(self, pypi_client):
+        """Test that a cache another scan is writing to doesn't fail the fetch."""
+        pypi_client._get_etag_cache()
+        blocker = sqlite3.connect(pypi_client.cache_dir / "registry_etags.db", isolation_level=None)
+        blocker.execute("BEGIN IMMEDIATE")
+        client = AsyncMock()
+        client.get.return_value = MagicMock(
+            status_code=200, headers={"ETag": '"v1"'}, content=b'{"info": {"home_page": "https://github.com/owner/pkg"}}'
+        )
+        
+        pypi_client.etag_cache.execute("PRAGMA busy_timeout=10")  # Keep the test fast
+        details = await pypi_client._fetch_package_details(client, "pkg", 1)
+        
+        blocker.rollback()
+        blocker.close()
+        await pypi_client.close()
+        
+        assert details["github_repo"] == "owner/pkg"
+    
+    @pytest.mark.asyncio
+    async def test_details_request_normalized_name(self, pypi_client):
+        """Test that package names are PEP 503-normalized so PyPI doesn't redirect."""
+        client = AsyncMock()
+        client.get.return_value = MagicMock(status_code=200, headers={}, content=b'{"info": {}}')
+        
+        details = await pypi_client._fetch_package_details(client, "Zope.Interface", 1)
+        
+        assert client.get.call_args.args[0] == f"{pypi_client.PYPI_API_URL}/zope-interface/json"
+        assert details["name"] == "Zope.Interface"
+    
+    @pytest.mark.asyncio
+    async def test_search_keeps_ranking_and_skips_failures(self, pypi_client):
+        """Test that detail lookups keep the dataset order and drop failed packages."""
+        rows = [{"project": name, "download_count": 100 - i} for i, name in enumerate(["slow", "missing", "fast"])]
+        
+        async def fake_get(url, headers=None):
+            if url == pypi_client.TOP_PACKAGES_URL:
+                return MagicMock(status_code=200, content=json.dumps({"rows": rows}).encode())
+            name = url.split("/")[-2]
+            if name == "slow":
+                await asyncio.sleep(0.01)
+            if name == "missing":
+                return MagicMock(status_code=404)
+            body = {"info": {"version": "1.0", "project_urls": {"Source": f"https://github.com/owner/{name}"}}}
+            return MagicMock(status_code=200, headers={}, content=json.dumps(body).encode())
+        
+        with patch.object(pypi_client, '_get_client') as mock_get_client:
+            mock_client = AsyncMock()
+            mock_client.get.side_effect = fake_get
+            mock_get_client.return_value = mock_client
+            
+            packages = await pypi_client.search_popular_packages(max_results=3, use_cache=False)
+        
+        assert [pkg["name"] for pkg in packages] == ["slow", "fast"]
+        assert packages[0]["github_repo"] == "owner/slow"
 
 
 class TestMavenClient:
@@ -165,14 +366,202 @@ class TestMavenClient:
         assert repo_list[0]["name"] == "google/guava"
         assert repo_list[0]["language"] == "Java"
         assert repo_list[0]["registry"] == "maven"
+    
+    @pytest.mark.asyncio
+    async def test_rate_limit_backoff_releases_semaphore(self, maven_client):
+        """Test that a 429 waits for Retry-After without holding a concurrency slot."""
+        limited = MagicMock(status_code=429, headers={"Retry-After": "5"})
+        page = MagicMock(status_code=200, content=json.dumps([
+            {"name": "com.google.guava:guava", "repository_url": "https://github.com/google/guava", "dependents_count": 9},
+        ]).encode())
+        sleeps = []
+        
+        async def fake_sleep(delay):
+            sleeps.append((delay, maven_client.sem.locked()))
+        
+        maven_client.sem = ConcurrencyLimiter(1)
+        with patch.object(maven_client, '_get_client') as mock_get_client, \
+                patch("src.registry_clients.asyncio.sleep", side_effect=fake_sleep):
+            mock_client = AsyncMock()
+            mock_client.get.side_effect = [limited, page]
+            mock_get_client.return_value = mock_client
+            
+            packages = await maven_client.search_popular_packages(max_results=1, use_cache=False)
+        
+        assert sleeps == [(5, False)]
+        assert packages[0]["github_repo"] == "google/guava"
+    
+    @pytest.mark.asyncio
+    async def test_pom_lookups_run_concurrently(self, maven_client):
+        """Test that POM fetches overlap instead of running one at a time."""
+        packages = [{"name": f"org.example:lib{i}", "version": "1.0", "github_repo": None} for i in range(3)]
+        in_flight, peak = [], []
+        
+        async def handler(request):
+            url = str(request.url)
+            in_flight.append(url)
+            await asyncio.sleep(0)
+            peak.append(len(in_flight))
+            in_flight.remove(url)
+            artifact = url.rsplit("/", 1)[-1].split("-")[0]
+            return httpx.Response(200, text=f"<project><scm><url>https://github.com/example/{artifact}</url></scm></project>")
+        
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        with patch.object(maven_client, '_get_client', AsyncMock(return_value=client)):
+            await maven_client._resolve_github_repos_from_pom(packages)
+        
+        assert max(peak) == 3
+        assert [pkg["github_repo"] for pkg in packages] == ["example/lib0", "example/lib1", "example/lib2"]
+    
+    @pytest.mark.asyncio
+    async def test_duplicate_coordinates_share_one_pom_fetch(self, maven_client):
+        requested = []
+        
+        def handler(request):
+            requested.append(request.url.path)
+            return httpx.Response(200, content=b"<project><scm><url>https://github.com/example/lib</url></scm></project>")
+        
+        packages = [{"name": "org.example:lib", "version": "1.0"} for _ in range(2)]
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        with patch.object(maven_client, '_get_client', AsyncMock(return_value=client)):
+            await maven_client._resolve_github_repos_from_pom(packages)
+        
+        assert len(requested) == 1
+        assert [pkg["github_repo"] for pkg in packages] == ["example/lib", "example/lib"]
+    
+    @pytest.mark.asyncio
+    async def test_pom_miss_is_not_fetched_again(self, maven_client):
+        """Test that a version whose POM named no repo is skipped on refresh."""
+        requested = []
+        
+        def handler(request):
+            requested.append(request.url.path)
+            return httpx.Response(200, content=b"<project><url>https://example.org</url></project>")
+        
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        with patch.object(maven_client, '_get_client', AsyncMock(return_value=client)):
+            first = await maven_client._resolve_github_repos_from_pom([{"name": "org.example:lib", "version": "1.0"}])
+            previous = {pkg["name"]: pkg for pkg in first}
+            
+            await maven_client._resolve_github_repos_from_pom([{"name": "org.example:lib", "version": "1.0"}], previous)
+            await maven_client._resolve_github_repos_from_pom([{"name": "org.example:lib", "version": "2.0"}], previous)
+        
+        assert first[0]["pom_checked"] is True
+        assert [path.rsplit("/", 1)[-1] for path in requested] == ["lib-1.0.pom", "lib-2.0.pom"]
+    
+    @pytest.mark.asyncio
+    async def test_pom_download_stops_after_resolved_scm(self, maven_client):
+        """Test that the rest of a POM isn't read once its SCM section resolves."""
+        chunks_read = []
+        
+        async def body():
+            for chunk in [b"<project><scm><url>https://github.com/owner/repo</url>", b"</scm>", b"<build/></project>"]:
+                chunks_read.append(chunk)
+                yield chunk
+        
+        client = httpx.AsyncClient(transport=httpx.MockTransport(lambda request: httpx.Response(200, content=body())))
+        
+        async with client.stream("GET", "https://repo1.maven.org/x.pom") as response:
+            assert await maven_client._stream_pom_github_repo(response) == "owner/repo"
+        assert len(chunks_read) == 2
+    
+    @pytest.mark.asyncio
+    async def test_oversized_pom_is_skipped(self, maven_client):
+        pom = b"<project><scm><url>https://github.com/owner/repo</url></scm></project>"
+        client = httpx.AsyncClient(transport=httpx.MockTransport(
+            lambda request: httpx.Response(200, content=pom, headers={"Content-Length": "2000000"})
+        ))
+        
+        async with client.stream("GET", "https://repo1.maven.org/x.pom") as response:
+            assert await maven_client._stream_pom_github_repo(response) is None
+    
+    @pytest.mark.asyncio
+    async def test_throttled_pom_is_retried_after_retry_after(self, maven_client):
+        responses = [
+            httpx.Response(503, headers={"Retry-After": "2"}),
+            httpx.Response(200, content=b"<project><scm><url>https://github.com/owner/repo</url></scm></project>"),
+        ]
+        client = httpx.AsyncClient(transport=httpx.MockTransport(lambda request: responses.pop(0)))
+        packages = [{"name": "org.example:lib", "version": "1.0"}]
+        
+        with patch.object(maven_client, '_get_client', AsyncMock(return_value=client)), \
+                patch("src.registry_clients.asyncio.sleep", new_callable=AsyncMock) as mock_sleep:
+            await maven_client._resolve_github_repos_from_pom(packages)
+        
+        mock_sleep.assert_awaited_once_with(2)
+        assert packages[0]["github_repo"] == "owner/repo"
+    
+    def test_parse_github_from_pom_prefers_scm(self, maven_client):
+        pom = b"""<?xml version="1.0" encoding="UTF-8"?>
+        <project xmlns="http://maven.apache.org/POM/4.0.0">
+            <url>https://github.com/site/project</url>
+            <scm>
+                <url>https://svn.example.org/repo</url>
+                <connection>scm:git:git://github.com/owner/repo.git</connection>
+            </scm>
+        </project>"""
+        
+        assert maven_client._parse_github_from_pom(pom) == "owner/repo"
+    
+    def test_parse_github_from_malformed_pom(self, maven_client):
+        pom = b"<project><url>https://example.org</url><scm><url>https://github.com/owner/repo</url></scm>"
+        
+        assert maven_client._parse_github_from_pom(pom) == "owner/repo"
+
+
+class TestConcurrencyLimiter:
+    """Tests for the adaptive concurrency cap."""
+    
+    @pytest.mark.asyncio
+    async def test_cap_halves_on_429_and_recovers(self):
+        limiter = ConcurrencyLimiter(4)
+        peak = []
+        
+        async def request():
+            async with limiter:
+                peak.append(limiter.in_flight)
+                await asyncio.sleep(0)
+        
+        limiter.record(429)
+        await asyncio.gather(*(request() for _ in range(6)))
+        assert (limiter.limit, max(peak)) == (2, 2)
+        
+        for _ in range(5):
+            limiter.record(200)
+        assert limiter.limit == 4
+        assert limiter.in_flight == 0
+
+
+class TestRateLimiter:
+    """Tests for the sliding-window rate limiter."""
+    
+    @pytest.mark.asyncio
+    async def test_waits_only_once_window_is_full(self):
+        clock = [100.0]
+        sleeps = []
+        
+        async def fake_sleep(delay):
+            sleeps.append(delay)
+            clock[0] += delay
+        
+        limiter = RateLimiter(2, 60.0)
+        with patch("src.registry_clients.time.monotonic", side_effect=lambda: clock[0]), \
+                patch("src.registry_clients.asyncio.sleep", side_effect=fake_sleep):
+            await limiter.acquire()
+            clock[0] += 10
+            await limiter.acquire()
+            await limiter.acquire()
+        
+        assert sleeps == [50.0]
+        assert list(limiter.calls) == [110.0, 160.0]
 
 
 class TestGitHubClient:
     """Tests for the GitHub client."""
     
     @pytest.fixture
-    def github_client(self):
-        return GitHubClient(token="test_token", concurrency=5)
+    def github_client(self, tmp_path):
+        return GitHubClient(token="test_token", concurrency=5, cache_dir=tmp_path)
     
     def test_client_initialization(self, github_client):
         assert github_client.base_url == "https://api.github.com"
@@ -185,10 +574,11 @@ class TestGitHubClient:
         """Test successful contributor stats fetch."""
         mock_response = MagicMock()
         mock_response.status_code = 200
-        mock_response.json.return_value = [
+        mock_response.headers = {}
+        mock_response.content = json.dumps([
             {"author": {"login": "user1"}, "total": 100},
             {"author": {"login": "user2"}, "total": 50},
-        ]
+        ]).encode()
         
         with patch.object(github_client, '_get_client') as mock_get_client:
             mock_client = AsyncMock()
@@ -222,10 +612,11 @@ class TestGitHubClient:
         """Test successful participation stats fetch."""
         mock_response = MagicMock()
         mock_response.status_code = 200
-        mock_response.json.return_value = {
+        mock_response.headers = {}
+        mock_response.content = json.dumps({
             "all": [10, 20, 30, 40] * 13,  # 52 weeks
             "owner": [5, 10, 15, 20] * 13,
-        }
+        }).encode()
         
         with patch.object(github_client, '_get_client') as mock_get_client:
             mock_client = AsyncMock()
@@ -239,6 +630,163 @@ class TestGitHubClient:
             assert len(result["data"]["all"]) == 52
 
 
+    @pytest.mark.asyncio
+    async def test_warmup_returns_core_rate_limit(self, github_client):
+        """Test that warmup reads the core rate limit."""
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = {
+            "resources": {"core": {"limit": 5000, "remaining": 4999}},
+        }
+        
+        with patch.object(github_client, '_get_client') as mock_get_client:
+            mock_client = AsyncMock()
+            mock_client.get.return_value = mock_response
+            mock_get_client.return_value = mock_client
+            
+            result = await github_client.warmup()
+            
+            assert result == {"limit": 5000, "remaining": 4999}
+            mock_client.get.assert_awaited_once_with("https://api.github.com/rate_limit")
+
+
+    @pytest.mark.asyncio
+    async def test_fetch_batch_streamed_yields_chunks(self, github_client):
+        """Test that streamed fetching yields every repo in chunks."""
+        async def fake_fetch_repo(repo_info):
+            return {"repo": repo_info["name"], "status": "success"}
+        
+        repo_list = [{"name": f"owner/repo{i}", "language": "Python"} for i in range(5)]
+        with patch.object(github_client, '_fetch_repo', side_effect=fake_fetch_repo):
+            chunks = [chunk async for chunk in github_client.fetch_batch_streamed(repo_list, chunk=2)]
+        
+        assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+        assert sorted(r["repo"] for chunk in chunks for r in chunk) == [r["name"] for r in repo_list]
+
+
+    @pytest.mark.asyncio
+    async def test_backoff_releases_semaphore(self, github_client):
+        """Test that 202 backoff sleeps don't hold a concurrency slot."""
+        pending = MagicMock(status_code=202)
+        done = MagicMock(status_code=200, headers={}, content=b'[{"total": 3}]')
+        locked_while_sleeping = []
+        
+        async def fake_sleep(delay):
+            locked_while_sleeping.append(github_client.sem.locked())
+        
+        github_client.sem = asyncio.Semaphore(1)
+        with patch.object(github_client, '_get_client') as mock_get_client, \
+                patch("src.ingestion.asyncio.sleep", side_effect=fake_sleep):
+            mock_client = AsyncMock()
+            mock_client.get.side_effect = [pending, done]
+            mock_get_client.return_value = mock_client
+            
+            result = await github_client.fetch_contributor_stats("owner/repo")
+        
+        assert result["contributions"] == [3]
+        assert locked_while_sleeping == [False]
+
+    
+    @pytest.mark.asyncio
+    async def test_not_modified_is_served_from_cache(self, github_client):
+        """Test that a 304 reuses the body cached with the response's ETag."""
+        fresh = MagicMock(status_code=200, headers={"ETag": '"abc"'}, content=b'[{"total": 7}, {"total": 2}]')
+        not_modified = MagicMock(status_code=304, headers={})
+        
+        with patch.object(github_client, '_get_client') as mock_get_client:
+            mock_client = AsyncMock()
+            mock_client.get.side_effect = [fresh, not_modified]
+            mock_get_client.return_value = mock_client
+            
+            first = await github_client.fetch_contributor_stats("owner/repo")
+            second = await github_client.fetch_contributor_stats("owner/repo")
+        
+        assert first["contributions"] == second["contributions"] == [7, 2]
+        assert mock_client.get.call_args_list[1].kwargs["headers"] == {"If-None-Match": '"abc"'}
+        await github_client.close()
+        
+        # Timestamped, so opening the cache later doesn't prune the entry
+        conn = sqlite3.connect(github_client.cache_dir / "github_etags.db")
+        assert conn.execute("SELECT refreshed_at IS NOT NULL FROM kv").fetchall() == [(1,)]
+        conn.close()
+
+    @pytest.mark.asyncio
+    async def test_locked_cache_falls_back_to_plain_request(self, github_client):
+        """Test that a cache a parallel scan is writing to doesn't abort the fetch."""
+        github_client._get_etag_cache().execute("PRAGMA busy_timeout=10")  # Keep the test fast
+        blocker = sqlite3.connect(github_client.cache_dir / "github_etags.db", isolation_level=None)
+        blocker.execute("BEGIN IMMEDIATE")
+        fresh = MagicMock(status_code=200, headers={"ETag": '"abc"'}, content=b'[{"total": 7}]')
+        
+        with patch.object(github_client, '_get_client') as mock_get_client:
+            mock_client = AsyncMock()
+            mock_client.get.return_value = fresh
+            mock_get_client.return_value = mock_client
+            
+            result = await github_client.fetch_contributor_stats("owner/repo")
+        
+        blocker.rollback()
+        blocker.close()
+        await github_client.close()
+        
+        assert result["contributions"] == [7]
+    
+    @pytest.mark.asyncio
+    async def test_fetch_batch_bounds_repos_in_flight(self, github_client):
+        """Test that fetch_batch keeps input order with at most `workers` repos in flight."""
+        in_flight, peak = 0, 0
+        
+        async def fake_fetch_repo(repo_info):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01 if repo_info["name"].endswith("0") else 0)
+            in_flight -= 1
+            return {"repo": repo_info["name"], "status": "success"}
+        
+        github_client.workers = 3
+        repo_list = [{"name": f"owner/repo{i}", "language": "Python"} for i in range(10)]
+        with patch.object(github_client, '_fetch_repo', side_effect=fake_fetch_repo):
+            results = await github_client.fetch_batch(repo_list)
+        
+        assert [r["repo"] for r in results] == [r["name"] for r in repo_list]
+        assert peak == 3
+
+
+    @pytest.mark.asyncio
+    async def test_search_repositories_fetches_pages_concurrently(self, github_client):
+        """Test that search pages after the first are requested from total_count."""
+        def page_response(url, params):
+            start = (params["page"] - 1) * params["per_page"]
+            response = MagicMock(status_code=200)
+            response.json.return_value = {
+                "total_count": 250,
+                "items": [{"full_name": f"owner/repo{i}", "language": None} for i in range(start, min(start + params["per_page"], 250))],
+            }
+            return response
+        
+        with patch.object(github_client, '_get_client') as mock_get_client:
+            mock_client = AsyncMock()
+            mock_client.get.side_effect = page_response
+            mock_get_client.return_value = mock_client
+            
+            repos = await github_client.search_repositories(max_results=220)
+        
+        assert [call.kwargs["params"]["page"] for call in mock_client.get.call_args_list] == [1, 2, 3]
+        assert [r["name"] for r in repos] == [f"owner/repo{i}" for i in range(220)]
+        assert repos[0]["language"] == "Unknown"
+
+    
+    @pytest.mark.asyncio
+    async def test_search_repositories_without_results_requested(self, github_client):
+        """Test that a zero or negative limit returns nothing without searching."""
+        with patch.object(github_client, '_fetch_search_page', new_callable=AsyncMock) as mock_fetch:
+            assert await github_client.search_repositories(max_results=0) == []
+            assert await github_client.search_repositories(max_results=-5) == []
+        
+        mock_fetch.assert_not_called()
+
+
 class TestCaching:
     """Tests for the caching functionality."""
     
@@ -254,16 +802,59 @@ class TestCaching:
         client._save_cache("test_cache", test_data)
         
         # Verify cache file exists
-        cache_path = tmp_path / "test_cache.json"
+        cache_path = tmp_path / "test_cache.json.gz"
         assert cache_path.exists()
         
         # Load from cache
         loaded = client._load_cache("test_cache")
         assert loaded == test_data
     
+    def test_cache_evicts_oldest_past_size_limit(self, tmp_path):
+        client = NPMClient(cache_dir=tmp_path)
+        
+        for i, key in enumerate(["oldest", "newer"]):
+            path = tmp_path / f"{key}.json"
+            path.write_bytes(b"x" * 600_000)
+            os.utime(path, (1_000 + i, 1_000 + i))
+        
+        with patch("src.registry_clients.MAX_CACHE_SIZE_MB", 1):
+            client._save_cache("fresh", [{"name": "package1"}])
+        
+        assert sorted(p.name for p in tmp_path.glob("*.json*")) == ["fresh.json.gz", "newer.json"]
+    
     def test_cache_invalid_when_missing(self, tmp_path):
         client = NPMClient(cache_dir=tmp_path)
         
         # Cache doesn't exist
         loaded = client._load_cache("nonexistent")
         assert loaded is None
+    
+    def test_cache_invalid_after_ttl(self, tmp_path):
+        client = NPMClient(cache_dir=tmp_path)
+        client._save_cache("test_cache", [{"name": "package1"}])
+        
+        cache_path = client._get_cache_path("test_cache")
+        expired = cache_path.stat().st_mtime - 8 * 86400
+        os.utime(cache_path, (expired, expired))
+        
+        assert client._load_cache("test_cache") is None
+    
+    def test_etag_cache_prunes_stale_entries(self, tmp_path):
+        # A cache left by an older version has no timestamps at all
+        conn = sqlite3.connect(tmp_path / "registry_etags.db")
+        conn.execute("CREATE TABLE kv (url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, body TEXT)")
+        conn.execute("INSERT INTO kv VALUES ('https://old', '\"a\"', NULL, '{}')")
+        conn.commit()
+        conn.close()
+        
+        client = NPMClient(cache_dir=tmp_path)
+        _store_etag_entry(client._get_etag_cache(), "https://fresh", '"b"', None, {})
+        _store_etag_entry(client._get_etag_cache(), "https://stale", '"c"', None, {})
+        client.etag_cache.execute("UPDATE kv SET refreshed_at = refreshed_at - 60 * 86400 WHERE url = 'https://stale'")
+        client.etag_cache.close()
+        client.etag_cache = None
+        
+        urls = [row[0] for row in client._get_etag_cache().execute("SELECT url FROM kv")]
+        client.etag_cache.close()
+        
+        assert urls == ["https://fresh"]